@@ -0,0 +1,195 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from wifitex.tools.hashcat import Hashcat
+
+import unittest
+from unittest import mock
+
+class TestHashcat(unittest.TestCase):
+    ''' Test suite for parsing `hashcat -I` output '''
+
+    hashcat_info = b'''
+hashcat (v6.2.6) starting in backend information mode
+
+CUDA Info:
+==========
+
+CUDA.Version.: 12.2
+
+Backend Device ID #1 (Alias: #2)
+  Name...........: NVIDIA GeForce RTX 3060
+  Processor(s)...: 28
+
+OpenCL Info:
+============
+
+OpenCL API (OpenCL 3.0 CUDA 12.2.135) - Platform #1 [NVIDIA Corporation]
+
+OpenCL Platform ID #1
+  Vendor..: The pocl project
+  Name....: Portable Computing Language
+  Version.: OpenCL 3.0 PoCL 3.1
+
+  Backend Device ID #2
+    Type...........: CPU
+    Name...........: cpu-haswell-Intel(R) Core(TM) i7-8700 CPU @ 3.20GHz
+
+OpenCL Platform ID #2
+  Vendor..: NVIDIA Corporation
+  Name....: NVIDIA CUDA
+  Version.: OpenCL 3.0 CUDA 12.2.135
+
+  Backend Device ID #3 (Alias: #1)
+    Type...........: GPU
+    Name...........: NVIDIA GeForce RTX 3060
+'''
+
+    def setUp(self):
+        Hashcat._reset_caches()
+
+    def tearDown(self):
+        Hashcat._reset_caches()
+
+    def testGpuInfoParsing(self):
+        ''' Asserts the first GPU device is reported with its name '''
+        with mock.patch.object(Hashcat, '_run_hashcat_info', return_value=self.hashcat_info):
+            info = Hashcat.get_gpu_info()
+        self.assertTrue(info['available'])
+        self.assertEqual(info['gpu_name'], 'NVIDIA GeForce RTX 3060')
+        self.assertEqual(info['cuda_version'], '12.2')
+        self.assertEqual(info['opencl_version'], 'OpenCL 3.0 CUDA 12.2.135')
+
+    def testHasGpu(self):
+        ''' Asserts the GPU shortcut agrees with the full parse '''
+        cpu_only = self.hashcat_info.split(b'OpenCL Platform ID #2')[0].replace(b'Backend Device ID #1 (Alias: #2)\n  Name...........: NVIDIA GeForce RTX 3060\n', b'')
+        with mock.patch.object(Hashcat, 'exists', return_value=True):
+            with mock.patch.object(Hashcat, '_run_hashcat_info', return_value=self.hashcat_info):
+                self.assertTrue(Hashcat.has_gpu())
+            with mock.patch.object(Hashcat, '_run_hashcat_info', return_value=cpu_only):
+                self.assertFalse(Hashcat.has_gpu())
+            # CUDA devices have no "Type" line, but are GPUs all the same
+            cuda_only = self.hashcat_info.split(b'OpenCL Info:')[0]
+            with mock.patch.object(Hashcat, '_run_hashcat_info', return_value=cuda_only):
+                self.assertTrue(Hashcat.has_gpu())
+            skipped = cuda_only.replace(b'Backend Device ID #1 (Alias: #2)', b'Backend Device ID #1 (skipped)')
+            with mock.patch.object(Hashcat, '_run_hashcat_info', return_value=skipped):
+                self.assertFalse(Hashcat.has_gpu())
+
+    def testCpuOnlyParsing(self):
+        ''' Asserts CPU-only backends are not reported as GPUs '''
+        cpu_only = self.hashcat_info.split(b'OpenCL Platform ID #2')[0].replace(b'Backend Device ID #1 (Alias: #2)\n  Name...........: NVIDIA GeForce RTX 3060\n', b'')
+        with mock.patch.object(Hashcat, '_run_hashcat_info', return_value=cpu_only):
+            info = Hashcat.get_gpu_info()
+        self.assertFalse(info['available'])
+
+    def testHashcatInfoIsCached(self):
+        ''' Asserts `hashcat -I` is spawned once for the --force and GPU checks '''
+        proc = mock.Mock(returncode=255)
+        proc.communicate.return_value = (b'', b'No devices found/left')
+        with mock.patch('subprocess.Popen', return_value=proc) as popen, \
+                mock.patch('wifitex.tools.dependency.Dependency.exists', return_value=True):
+            self.assertTrue(Hashcat.should_use_force())
+            self.assertTrue(Hashcat.should_use_force())
+            self.assertFalse(Hashcat.has_gpu())
+        self.assertEqual(popen.call_count, 1)
+
+    def testPrimedHashcatInfo(self):
+        ''' Asserts a background `hashcat -I` started early is reused '''
+        primed = mock.Mock(returncode=0)
+        primed.communicate.return_value = (self.hashcat_info, b'')
+        with mock.patch('subprocess.Popen', return_value=primed) as popen, \
+                mock.patch.object(Hashcat, 'exists', return_value=True):
+            Hashcat._prime_hashcat_info()
+            self.assertFalse(Hashcat.should_use_force())
+            self.assertTrue(Hashcat.has_gpu())
+        self.assertEqual(popen.call_count, 1)
+        primed.communicate.assert_called_once()
+
+    def testPmkidFilesShareOneRun(self):
+        ''' Asserts several .22000 files are attacked in one merged hashcat run '''
+        import os, shutil, tempfile
+        from wifitex.config import Configuration
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        pmkid_files = []
+        for index in range(2):
+            path = os.path.join(temp_dir, 'pmkid_%d.22000' % index)
+            with open(path, 'w') as hash_file:
+                hash_file.write('WPA*01*hash%d*ap*sta*essid***\n' % index)
+            pmkid_files.append(path)
+        wordlist = os.path.join(temp_dir, 'words.txt')
+
+        merged_inputs = []
+        def run_task(hash_input, hash_mode, task, show_command=False, use_force=None):
+            with open(hash_input) as merged:
+                merged_inputs.append(merged.read())
+            return 0, None
+
+        show_keys = {pmkid_files[0]: [None, 'password1'], pmkid_files[1]: [None, None]}
+        def show(hash_input, hash_mode, show_command=False, use_force=None):
+            return show_keys[hash_input].pop(0)
+
+        with mock.patch.object(Hashcat, '_run_hashcat_task', side_effect=run_task), \
+                mock.patch.object(Hashcat, '_run_hashcat_show', side_effect=show), \
+                mock.patch.object(Configuration, 'temp', side_effect=lambda *a: os.path.join(temp_dir, *a)):
+            keys = Hashcat.crack_pmkid_files(pmkid_files, wordlists=[wordlist])
+
+        self.assertEqual(len(merged_inputs), 1)
+        self.assertEqual(merged_inputs[0].count('WPA*01*'), 2)
+        self.assertEqual(keys, {pmkid_files[0]: 'password1', pmkid_files[1]: None})
+
+    def testDeviceLanes(self):
+        ''' Asserts combined wordlists are sharded across distinct GPUs only '''
+        from wifitex.config import Configuration
+        with mock.patch.object(Hashcat, '_run_hashcat_info', return_value=self.hashcat_info):
+            self.assertEqual(Hashcat._get_gpu_device_ids(), [1])
+        two_gpus = self.hashcat_info.replace(
+            b'Backend Device ID #1 (Alias: #2)', b'Backend Device ID #1\nBackend Device ID #4')
+        task = {'mode': '0', 'wordlist': 'a', 'wordlists': ['a', 'b', 'c'], 'mask': None, 'options': {}}
+        with mock.patch.object(Hashcat, '_run_hashcat_info', return_value=two_gpus), \
+                mock.patch.object(Configuration, 'hashcat_multi_device', True, create=True), \
+                mock.patch.object(Configuration, 'temp', return_value='/tmp'):
+            lanes = Hashcat._device_lanes([task])
+        self.assertEqual([[(t['device'], t['wordlists']) for t in lane] for lane in lanes],
+                         [[(1, ['a', 'c'])], [(4, ['b'])]])
+
+    def testCudaOnlyHostKeepsBruteForce(self):
+        ''' Asserts a CUDA-only GPU (no OpenCL "Type" line) still gets the mask attack '''
+        from wifitex.config import Configuration
+        cuda_only = self.hashcat_info.split(b'OpenCL Info:')[0]
+        brute_options = {'enabled': True, 'modes': ['3'], 'mask': '?d?d', 'timeout_seconds': None}
+        with mock.patch.object(Hashcat, 'exists', return_value=True), \
+                mock.patch.object(Configuration, 'brute_force_require_gpu', True, create=True), \
+                mock.patch.object(Configuration, 'temp', return_value='/tmp'):
+            with mock.patch.object(Hashcat, '_run_hashcat_info', return_value=cuda_only):
+                self.assertEqual(Hashcat._get_gpu_device_ids(), [1])
+                tasks = Hashcat._build_hashcat_tasks([], brute_options)
+            self.assertEqual([task['mode'] for task in tasks], ['3'])
+            with mock.patch.object(Hashcat, '_run_hashcat_info', return_value=b''), \
+                    mock.patch('wifitex.tools.hashcat.Color'):
+                self.assertEqual(Hashcat._build_hashcat_tasks([], brute_options), [])
+
+    def testUnpinnedTasksRunSerially(self):
+        ''' Asserts tasks that share a device are never run at the same time '''
+        import threading, time
+        lock = threading.Lock()
+        active = []
+        overlaps = []
+        def run_task(hash_input, hash_mode, task, *args, **kwargs):
+            with lock:
+                active.append(task['mode'])
+                overlaps.append(len(active))
+            time.sleep(0.05)
+            with lock:
+                active.remove(task['mode'])
+            return 0, None
+
+        tasks = [{'mode': '0', 'wordlist': 'a', 'wordlists': ['a'], 'mask': None, 'options': {}},
+                 {'mode': '3', 'wordlist': None, 'mask': '?d?d', 'options': {}}]
+        with mock.patch.object(Hashcat, '_run_hashcat_task', side_effect=run_task):
+            self.assertIsNone(Hashcat._run_hashcat_tasks('hash', '22000', tasks, use_force=False))
+        self.assertEqual(overlaps, [1, 1])
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,108 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from wifitex.tools.john import John
+
+import unittest
+from unittest import mock
+
+class TestJohn(unittest.TestCase):
+    ''' Test suite for the John the Ripper wrapper '''
+
+    def setUp(self):
+        John._format_cache = None
+
+    def tearDown(self):
+        John._format_cache = None
+
+    def testFormatIsDetectedOnce(self):
+        ''' Asserts `john --list=formats` is spawned once and the GPU format is preferred '''
+        process = mock.Mock()
+        process.stdout.return_value = 'wpapsk, wpapsk-pmk, wpapsk-opencl, wpapsk-pmk-opencl'
+        with mock.patch('wifitex.tools.john.Process', return_value=process) as spawn:
+            self.assertEqual(John._detect_format(), 'wpapsk-opencl')
+            self.assertEqual(John._detect_format(), 'wpapsk-opencl')
+        self.assertEqual(spawn.call_count, 1)
+
+    def testCrackHandshakeReadsShowOutput(self):
+        ''' Asserts the key is read from the `john --show` line naming the capture '''
+        import os, tempfile
+        handshake = mock.Mock(capfile='hs/handshake_Test_AA-BB-CC-DD-EE-FF.cap')
+        john_file = tempfile.NamedTemporaryFile(suffix='.john', delete=False).name
+        show_lines = iter([
+            'Test:s3cr3t pass:aa-bb-cc-dd-ee-ff:11-22-33-44-55-66:aabbccddeeff::WPA2:%s\n' % handshake.capfile,
+            '\n',
+            '1 password hash cracked, 0 left\n',
+        ])
+        crack = mock.Mock()
+        show = mock.Mock()
+        show.stdoutln.side_effect = lambda: next(show_lines, '')
+        show.poll.return_value = 0
+        John._format_cache = 'wpapsk'
+        with mock.patch('wifitex.tools.hashcat.HcxPcapTool.generate_john_file', return_value=john_file), \
+                mock.patch('wifitex.tools.john.Process', side_effect=[crack, show]):
+            key = John.crack_handshake(handshake, wordlist='words.txt')
+        self.assertEqual(key, 's3cr3t pass')
+        self.assertFalse(os.path.exists(john_file))
+
+    def testCrackHandshakesSharesOneRun(self):
+        ''' Asserts several captures are cracked with one john run and keys are mapped back '''
+        import os, shutil, tempfile
+        from wifitex.config import Configuration
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        handshakes = [mock.Mock(capfile='hs/a.cap'), mock.Mock(capfile='hs/xa.cap')]
+
+        def generate(handshake, show_command=False):
+            path = os.path.join(temp_dir, 'generated.john')
+            with open(path, 'w') as john_file:
+                john_file.write('Net:$WPAPSK$Net#hash:aabb:ccdd:aabb::WPA2:verified:%s\n' % handshake.capfile)
+            return path
+
+        show_lines = iter(['Net:key:x:aabb:ccdd:aabb::WPA2:verified:hs/xa.cap\n', '1 password hash cracked, 1 left\n'])
+        crack = mock.Mock()
+        show = mock.Mock()
+        show.stdoutln.side_effect = lambda: next(show_lines, '')
+        show.poll.return_value = 0
+        John._format_cache = 'wpapsk'
+        with mock.patch('wifitex.tools.hashcat.HcxPcapTool.generate_john_file', side_effect=generate), \
+                mock.patch('wifitex.tools.john.Process', side_effect=[crack, show]) as spawn, \
+                mock.patch.object(Configuration, 'temp', side_effect=lambda *a: os.path.join(temp_dir, *a)):
+            keys = John.crack_handshakes(handshakes, wordlist='words.txt')
+
+        self.assertEqual(spawn.call_count, 2)
+        # The password itself contains ':'
+        self.assertEqual(keys, {'hs/a.cap': None, 'hs/xa.cap': 'key:x'})
+
+    def testCrackHandshakesSkipsUnconvertibleCapture(self):
+        ''' Asserts one capture hcxpcaptool cannot convert does not abort the batch '''
+        import os, shutil, tempfile
+        from wifitex.config import Configuration
+        temp_dir = tempfile.mkdtemp()
+        self.addCleanup(shutil.rmtree, temp_dir)
+        handshakes = [mock.Mock(capfile='hs/bad.cap'), mock.Mock(capfile='hs/a.cap'), mock.Mock(capfile='hs/b.cap')]
+
+        def generate(handshake, show_command=False):
+            if handshake.capfile == 'hs/bad.cap':
+                raise ValueError('Failed to generate John file')
+            path = os.path.join(temp_dir, 'generated.john')
+            with open(path, 'w') as john_file:
+                john_file.write('Net:$WPAPSK$Net#hash:aabb:ccdd:aabb::WPA2:verified:%s\n' % handshake.capfile)
+            return path
+
+        show_lines = iter(['Net:secret:aabb:ccdd:aabb::WPA2:verified:hs/b.cap\n', '1 password hash cracked, 1 left\n'])
+        crack = mock.Mock()
+        show = mock.Mock()
+        show.stdoutln.side_effect = lambda: next(show_lines, '')
+        show.poll.return_value = 0
+        John._format_cache = 'wpapsk'
+        with mock.patch('wifitex.tools.hashcat.HcxPcapTool.generate_john_file', side_effect=generate), \
+                mock.patch('wifitex.tools.john.Process', side_effect=[crack, show]), \
+                mock.patch('wifitex.tools.john.Color'), \
+                mock.patch.object(Configuration, 'temp', side_effect=lambda *a: os.path.join(temp_dir, *a)):
+            keys = John.crack_handshakes(handshakes, wordlist='words.txt')
+
+        self.assertEqual(keys, {'hs/bad.cap': None, 'hs/a.cap': None, 'hs/b.cap': 'secret'})
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,67 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+
+from wifitex.tools.pixiewps import Pixiewps
+
+import unittest
+from unittest import mock
+
+class TestPixiewps(unittest.TestCase):
+    ''' Test suite for extracting Pixie-Dust parameters from reaver output '''
+
+    command_output = '''
+[+] Received M1 message
+[+] Sending M2 message
+executing pixiewps -e d0141b15656e96b8 -s 5a67001334e3e4cb -z c8a2ccc5fb6dc4f4 -a 60b59c0c587c6c44 -n 04d48dc20ec78576 -r 7a191e22a7b519f4
+'''
+
+    label_output = '''
+[+] Received M3 message
+[P] E-Nonce: 8e0c26d8b3b3d8a7e7a3c3f43df0e2a3
+[P] PKE: d0141b15656e96b8
+[P] AuthKey: 60b59c0c587c6c44
+[P] E-Hash1: 5a67001334e3e4cb
+[P] E-Hash2: c8a2ccc5fb6dc4f4
+[P] R-Nonce: 7a191e22a7b519f4
+[+] BSSID: EC:1A:59:37:70:0E
+'''
+
+    def testPixiewpsCommandLine(self):
+        ''' Asserts all parameters are read from an echoed pixiewps command '''
+        params = Pixiewps.extract_parameters_from_reaver_output(self.command_output)
+        self.assertEqual(params, {
+            'pke': 'd0141b15656e96b8',
+            'e_hash1': '5a67001334e3e4cb',
+            'e_hash2': 'c8a2ccc5fb6dc4f4',
+            'authkey': '60b59c0c587c6c44',
+            'e_nonce': '04d48dc20ec78576',
+            'r_nonce': '7a191e22a7b519f4',
+        })
+
+    def testLabelledOutput(self):
+        ''' Asserts parameters are read from reaver's labelled -vvv output '''
+        params = Pixiewps.extract_parameters_from_reaver_output(self.label_output)
+        self.assertEqual(params, {
+            'pke': 'd0141b15656e96b8',
+            'e_hash1': '5a67001334e3e4cb',
+            'e_hash2': 'c8a2ccc5fb6dc4f4',
+            'authkey': '60b59c0c587c6c44',
+            'e_nonce': '8e0c26d8b3b3d8a7e7a3c3f43df0e2a3',
+            'r_nonce': '7a191e22a7b519f4',
+            'e_bssid': 'EC:1A:59:37:70:0E',
+        })
+
+    def testMissingParameters(self):
+        ''' Asserts None is returned when the exchange did not reach M3 '''
+        self.assertIsNone(Pixiewps.extract_parameters_from_reaver_output('[+] Trying pin "12345670"\n'))
+        self.assertIsNone(Pixiewps.extract_parameters_from_reaver_output(''))
+
+    def testCrackPinRejectsNonHex(self):
+        ''' Asserts pixiewps is not spawned for malformed parameters '''
+        with mock.patch('subprocess.run') as spawn:
+            self.assertIsNone(Pixiewps.crack_pin('test_pke', 'test_hash1', 'test_hash2'))
+            self.assertIsNone(Pixiewps.crack_pin('d014', '5a67', None))
+        spawn.assert_not_called()
+
+if __name__ == '__main__':
+    unittest.main()
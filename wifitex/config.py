@@ -85,6 +85,11 @@ class Configuration(object):
         cls.brute_force_mode = '0'   # Default to dictionary attack mode for hashcat
         cls.brute_force_mask = '?d?d?d?d?d?d?d?d'  # Default mask when brute force is enabled
         cls.brute_force_timeout = 3600  # Maximum time (seconds) to spend on brute force
+        cls.brute_force_require_gpu = True  # Skip hashcat mask attacks (-a 3) when no GPU is detected
+        cls.hashcat_workload_profile = 3  # hashcat -w (1-4); 3 = high, 0/None leaves hashcat's default
+        cls.hashcat_slow_candidates = True  # hashcat -S for WPA dictionary attacks
+        cls.hashcat_potfile = None  # hashcat --potfile-path; None keeps hashcat's default (persists across runs)
+        cls.hashcat_multi_device = False  # Shard wordlists across GPUs, one hashcat per device (-d)
 
         # Default dictionary for cracking
         cls.cracked_file = os.path.join('cracked', 'cracked.txt')
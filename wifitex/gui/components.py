@@ -1303,27 +1303,18 @@ class SettingsPanel(QWidget):
         try:
             import os
             
+            from .wordlist_manager import get_package_wordlists
+            
             current_data = self.wordlist_combo.currentData()
             current_text = self.wordlist_combo.currentText()
             
-            # Get wifitex package directory to identify default wordlists
-            # The wordlists are in the same directory as wordlist_manager (wifitex/gui/wordlist_manager.py)
-            # So we need to go: wifitex/gui -> wifitex -> wifitex/wordlists
-            wifitex_package_dir = os.path.dirname(os.path.dirname(__file__))
-            wifitex_wordlists_dir = os.path.join(wifitex_package_dir, 'wordlists')
-            
             # Clear existing items
             self.wordlist_combo.clear()
             
-            # ONLY scan wifitex/wordlists folder (no system-wide scanning)
-            if os.path.exists(wifitex_wordlists_dir) and os.path.isdir(wifitex_wordlists_dir):
-                # Scan all .txt, .lst, .gz files in wifitex/wordlists folder
-                for root, dirs, files in os.walk(wifitex_wordlists_dir):
-                    for file in files:
-                        if any(ext in file.lower() for ext in ['.txt', '.lst', '.gz']):
-                            wordlist_path = os.path.join(root, file)
-                            display_name = f"📁 {file}"
-                            self.wordlist_combo.addItem(display_name, wordlist_path)
+            # ONLY list the wifitex/wordlists folder (no system-wide scanning)
+            for wordlist_path in get_package_wordlists():
+                display_name = f"📁 {os.path.basename(wordlist_path)}"
+                self.wordlist_combo.addItem(display_name, wordlist_path)
             
             # Add custom wordlist paths if enabled
             if (
@@ -5003,28 +4994,19 @@ class AttackWorker(QThread):
         """Get default wordlist from wifitex/wordlists/ folder"""
         try:
             import os
-            # Get wifitex package directory
-            wifitex_package_dir = os.path.dirname(os.path.dirname(__file__))
-            wifitex_wordlists_dir = os.path.join(wifitex_package_dir, 'wordlists')
-            
-            if os.path.exists(wifitex_wordlists_dir) and os.path.isdir(wifitex_wordlists_dir):
-                # Look for wordlist files in wifitex/wordlists/
-                wordlist_files = []
-                for root, dirs, files in os.walk(wifitex_wordlists_dir):
-                    for file in files:
-                        if any(ext in file.lower() for ext in ['.txt', '.lst', '.gz']):
-                            wordlist_path = os.path.join(root, file)
-                            if os.path.exists(wordlist_path):
-                                wordlist_files.append(wordlist_path)
-                
-                # Prefer wordlist-top4800-probable.txt, otherwise use first available
-                for wordlist in wordlist_files:
-                    if 'wordlist-top4800-probable' in os.path.basename(wordlist).lower():
-                        return wordlist
-                
-                # Return first available wordlist if no preferred one found
-                if wordlist_files:
-                    return wordlist_files[0]
+            from .wordlist_manager import get_package_wordlists
+            
+            # Look for wordlist files in wifitex/wordlists/
+            wordlist_files = get_package_wordlists()
+            
+            # Prefer wordlist-top4800-probable.txt, otherwise use first available
+            for wordlist in wordlist_files:
+                if 'wordlist-top4800-probable' in os.path.basename(wordlist).lower():
+                    return wordlist
+            
+            # Return first available wordlist if no preferred one found
+            if wordlist_files:
+                return wordlist_files[0]
             
             return None
         except Exception as e:
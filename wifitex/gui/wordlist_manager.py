@@ -16,6 +16,37 @@ from .logger import get_logger
 
 logger = get_logger('wordlist_manager')
 
+WORDLIST_EXTENSIONS = ('.txt', '.lst', '.gz')
+
+_package_wordlists_cache: Optional[List[str]] = None
+
+
+def get_package_wordlists(refresh: bool = False) -> List[str]:
+    """Return the wordlist files bundled in wifitex/wordlists (scanned once and cached)"""
+    global _package_wordlists_cache
+    if _package_wordlists_cache is not None and not refresh:
+        return list(_package_wordlists_cache)
+
+    # wifitex/gui -> wifitex -> wifitex/wordlists
+    wifitex_package_dir = os.path.dirname(os.path.dirname(__file__))
+    pending = [os.path.join(wifitex_package_dir, 'wordlists')]
+    found: List[str] = []
+    # os.scandir entries carry their file type from readdir, so no per-file stat is needed
+    while pending:
+        try:
+            with os.scandir(pending.pop()) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        pending.append(entry.path)
+                    elif entry.name.lower().endswith(WORDLIST_EXTENSIONS) and entry.is_file():
+                        found.append(entry.path)
+        except OSError as e:
+            logger.debug(f"Could not scan wordlist folder: {e}")
+
+    _package_wordlists_cache = found
+    return list(found)
+
+
 class WordlistManager:
     """Manages wordlists for password cracking"""
     
@@ -31,24 +62,10 @@ class WordlistManager:
         # Initialize with empty list
         wordlist_paths = []
         
-        # FIRST: Scan wifitex/wordlists folder (default wordlists)
-        try:
-            # Get the path to wifitex/wordlists folder
-            # The wordlists are in the same directory as this file (wifitex/gui/wordlist_manager.py)
-            # So we need to go: wifitex/gui -> wifitex -> wifitex/wordlists
-            wifitex_package_dir = os.path.dirname(os.path.dirname(__file__))
-            wifitex_wordlists_dir = os.path.join(wifitex_package_dir, 'wordlists')
-            
-            if os.path.exists(wifitex_wordlists_dir) and os.path.isdir(wifitex_wordlists_dir):
-                # Scan all .txt, .lst, .gz files in wifitex/wordlists folder
-                for root, dirs, files in os.walk(wifitex_wordlists_dir):
-                    for file in files:
-                        if any(ext in file.lower() for ext in ['.txt', '.lst', '.gz']):
-                            wifitex_wordlist_path = os.path.join(root, file)
-                            wordlist_paths.append(wifitex_wordlist_path)  # Add to front for priority
-                            logger.info(f"Detected wifitex wordlist (default): {file}")
-        except Exception as e:
-            logger.debug(f"Could not scan wifitex/wordlists folder: {e}")
+        # FIRST: wifitex/wordlists folder (default wordlists)
+        for wifitex_wordlist_path in get_package_wordlists(refresh=True):
+            wordlist_paths.append(wifitex_wordlist_path)
+            logger.info(f"Detected wifitex wordlist (default): {os.path.basename(wifitex_wordlist_path)}")
         
         # SECOND: Add system wordlists (extra wordlists)
         system_wordlists = cast(List[str], get_dynamic_wordlist_paths() or [])
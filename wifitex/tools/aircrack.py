@@ -3,7 +3,6 @@
 
 from .dependency import Dependency
 from ..util.process import Process
-from ..util.input import xrange
 from ..config import Configuration
 
 import os
@@ -63,7 +62,7 @@ class Aircrack(Dependency):
     def _hex_and_ascii_key(hex_raw):
         hex_chars = []
         ascii_key = ''
-        for index in xrange(0, len(hex_raw), 2):
+        for index in range(0, len(hex_raw), 2):
             byt = hex_raw[index:index+2]
             hex_chars.append(byt)
             byt_int = int(byt, 16)
@@ -117,8 +116,8 @@ class Aircrack(Dependency):
 
         while crack_proc.poll() is None:
             line = stdout_stream.readline()
-            match_nums = aircrack_nums_re.search(line.decode('utf-8'))
-            match_keys = aircrack_key_re.search(line.decode('utf-8'))
+            match_nums = aircrack_nums_re.search(line)
+            match_keys = aircrack_key_re.search(line)
             if match_nums:
                 num_tried = int(match_nums.group(1))
                 num_total = int(match_nums.group(2))
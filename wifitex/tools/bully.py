@@ -223,9 +223,7 @@ class Bully(Attack, Dependency):
                 Color.pe('{R}[bully] stdout pipe is not available; cannot parse output{W}')
             return
 
-        for line in iter(stdout_stream.readline, b''):
-            if line == '': continue
-            line = line.decode('utf-8')
+        for line in iter(stdout_stream.readline, ''):
             line = line.replace('\r', '').replace('\n', '').strip()
 
             if Configuration.verbose > 1:
@@ -6,10 +6,42 @@ from ..config import Configuration
 from ..util.process import Process
 from ..util.color import Color
 
+import contextlib
 import os
 import re
+import shlex
+import subprocess
+import threading
 import uuid
-from typing import Any, Dict, List, Optional
+from concurrent.futures import ThreadPoolExecutor, as_completed, wait
+from typing import Any, Dict, List, Optional, Tuple
+
+# `hashcat -I` output is scanned as raw bytes; only the few matched substrings
+# get decoded. Only the device-describing lines are of interest; everything
+# else is skipped by the regex engine instead of being visited in Python.
+_RE_GPU_LINES = re.compile(rb'^[ \t]*(Backend Device ID|Device #|Device Type|Name|Type)[^\n]*', re.M)
+# Groups: 1 = CUDA.Version field, 2 = "CUDA API (...)" header, 3 = "OpenCL API (...)" header
+_RE_BACKEND_VERSIONS = re.compile(
+    rb'CUDA\.Version\.\s*:\s*([^\n]+)|CUDA API\s*\(([^)]+)\)|OpenCL API\s*\(([^)]+)\)')
+_RE_ANY_GPU = re.compile(rb'^[ \t]*(?:Device )?Type[ .]*:[^\n]*GPU', re.M | re.I)
+# A device listed (and not skipped) in a CUDA/HIP/Metal section; those carry no type line.
+_RE_GPU_BACKEND_DEVICE = re.compile(
+    rb'^(?:CUDA|HIP|Metal) Info:(?:(?!^\w+ Info:).)*?'
+    rb'^[ \t]*(?:Backend )?Device (?:ID )?#\d+(?![^\n]*skipped)', re.M | re.S)
+# Groups: 1 = backend section header, 2/3 = device ID and the rest of its line, 4 = device type
+_RE_DEVICE_LINES = re.compile(
+    rb'^(CUDA|HIP|OpenCL|Metal) Info:'
+    rb'|^[ \t]*(?:Backend )?Device (?:ID )?#(\d+)([^\n]*)'
+    rb'|^[ \t]*(?:Device )?Type[ .]*:([^\n]*)', re.M)
+_RE_DEVICE_ALIAS = re.compile(rb'Alias: #(\d+)')
+
+# Eight digits: the shortest WPA passphrase length.
+_DEFAULT_MASK = '?d' * 8
+
+
+def _format_command(command: List[str]) -> str:
+    """Shell-quoted command line for display; only built when it is shown."""
+    return ' '.join(shlex.quote(arg) for arg in command)
 
 
 class Hashcat(Dependency):
@@ -23,15 +55,45 @@ class Hashcat(Dependency):
             return value.decode('utf-8', errors='ignore')
         return value or ''
 
-    @staticmethod
-    def should_use_force():
-        if not Hashcat.exists():
+    # Device query. Plain -I is kept on purpose: -II only adds detail, and the
+    # parsers below rely on the human-readable "Name....:"/"Type....:" layout.
+    _INFO_COMMAND = ['hashcat', '-I']
+
+    # Seconds allowed for the one-shot `hashcat -I` and `hashcat -b` queries
+    _INFO_TIMEOUT = 15
+    _BENCHMARK_TIMEOUT = 300
+
+    # The available devices do not change during a run, so these are computed
+    # once per process (see `_reset_caches`). `exists()` is not cached here:
+    # Process.which already caches found paths and rechecks missing ones.
+    _force_cache: Optional[bool] = None
+    _info_cache: Optional[Tuple[bytes, bytes, Optional[int]]] = None
+    _info_proc: Optional[subprocess.Popen] = None  # background query started by `_prime_hashcat_info`
+    _info_lock = threading.Lock()
+    # (raw Configuration values, normalized options) of the last call without overrides
+    _bruteforce_cache: Optional[Tuple[Tuple[Any, ...], Dict[str, Any]]] = None
+
+    @classmethod
+    def _reset_caches(cls):
+        cls._force_cache = None
+        cls._info_cache = None
+        cls._info_proc = None
+        cls._bruteforce_cache = None
+
+    @classmethod
+    def should_use_force(cls):
+        """
+        True when hashcat reports no usable devices and needs `--force`.
+        Cached for the process; derived from the shared `hashcat -I` result.
+        """
+        if cls._force_cache is not None:
+            return cls._force_cache
+        if not cls.exists():
+            cls._force_cache = False
             return False
-        command = ['hashcat', '-I']
-        proc = Process(command)
-        stderr_raw = proc.stderr()
-        stderr = Hashcat._ensure_text(stderr_raw)
-        return 'No devices found/left' in stderr
+        _, stderr, _ = cls._query_hashcat_info()
+        cls._force_cache = b'No devices found/left' in stderr
+        return cls._force_cache
 
     @staticmethod
     def has_gpu() -> bool:
@@ -39,24 +101,70 @@ class Hashcat(Dependency):
         Return True when a GPU-capable accelerator is detected by hashcat.
         Falls back to False if hashcat is unavailable or the query fails.
         """
-        info = Hashcat.get_gpu_info()
-        return info.get('available', False)
-
-    @staticmethod
-    def _run_hashcat_info() -> str:
-        """Execute `hashcat -I` and return combined stdout/stderr output."""
         if not Hashcat.exists():
-            return ''
+            return False
+        try:
+            output = Hashcat._run_hashcat_info()
+        except Exception:
+            return False
+        # Only a yes/no is needed here, so skip the full get_gpu_info() parse.
+        # Like `_get_gpu_device_ids`, any CUDA/HIP/Metal device counts as a GPU.
+        return _RE_GPU_BACKEND_DEVICE.search(output) is not None or _RE_ANY_GPU.search(output) is not None
+
+    @classmethod
+    def _query_hashcat_info(cls) -> Tuple[bytes, bytes, Optional[int]]:
+        """
+        Run `hashcat -I` once per process and return raw (stdout, stderr, return_code).
+        A query that could not complete is cached too (return_code None, the
+        error in stderr) so a hung or broken hashcat is not re-probed per call.
+        """
+        with cls._info_lock:
+            if cls._info_cache is not None:
+                return cls._info_cache
+            proc, cls._info_proc = cls._info_proc, None
+            try:
+                if proc is None:
+                    proc = subprocess.Popen(cls._INFO_COMMAND, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+                # Raw bytes: nothing is decoded until a field is actually extracted.
+                try:
+                    stdout, stderr = proc.communicate(timeout=cls._INFO_TIMEOUT)
+                except subprocess.TimeoutExpired:
+                    proc.kill()
+                    proc.communicate()
+                    raise
+                cls._info_cache = (stdout or b'', stderr or b'', proc.returncode)
+            except (OSError, subprocess.SubprocessError) as exc:
+                cls._info_cache = (b'', str(exc).encode('utf-8', errors='ignore'), None)
+            return cls._info_cache
+
+    @classmethod
+    def _prime_hashcat_info(cls):
+        """
+        Start `hashcat -I` in the background so its startup overlaps other work
+        (e.g. capture conversion); `_query_hashcat_info` collects the result.
+        """
+        with cls._info_lock:
+            if cls._info_cache is not None or cls._info_proc is not None or not cls.exists():
+                return
+            try:
+                cls._info_proc = subprocess.Popen(cls._INFO_COMMAND, stdout=subprocess.PIPE, stderr=subprocess.PIPE)
+            except OSError:
+                # Left to `_query_hashcat_info`, which records the failure.
+                cls._info_proc = None
+
+    @classmethod
+    def _run_hashcat_info(cls) -> bytes:
+        """Execute `hashcat -I` and return combined stdout/stderr output as bytes."""
+        if not cls.exists():
+            return b''
 
         try:
-            proc = Process(['hashcat', '-I'])
-            stdout = Hashcat._ensure_text(proc.stdout())
-            stderr = Hashcat._ensure_text(proc.stderr())
-            return_code = proc.pid.returncode
+            stdout, stderr, return_code = cls._query_hashcat_info()
+            combined = b'\n'.join((stdout, stderr)).strip()
             if return_code not in (0,):
-                combined = f'{stdout}\n{stderr}'.strip()
-                raise RuntimeError(f'`hashcat -I` failed with exit code {return_code}: {combined or "no output"}')
-            return f'{stdout}\n{stderr}'.strip()
+                text = Hashcat._ensure_text(combined)
+                raise RuntimeError(f'`hashcat -I` failed with exit code {return_code}: {text or "no output"}')
+            return combined
         except Exception as exc:
             raise RuntimeError(f'Failed to query hashcat capabilities: {exc}') from exc
 
@@ -88,34 +196,39 @@ class Hashcat(Dependency):
                 info['error'] = '`hashcat -I` returned no output'
             return info
 
-        cuda_version = re.search(r'CUDA\.Version\.\s*:\s*([^\n]+)', output)
-        if cuda_version:
-            info['cuda_version'] = cuda_version.group(1).strip()
-        else:
-            cuda_api = re.search(r'CUDA API\s*\(([^)]+)\)', output)
-            if cuda_api:
-                info['cuda_version'] = cuda_api.group(1).strip()
+        # One scan for all version fields; the CUDA.Version field wins over the CUDA API header.
+        cuda_version = cuda_api = opencl_version = None
+        for match in _RE_BACKEND_VERSIONS.finditer(output):
+            if match.group(1) is not None:
+                cuda_version = cuda_version or match.group(1)
+            elif match.group(2) is not None:
+                cuda_api = cuda_api or match.group(2)
+            else:
+                opencl_version = opencl_version or match.group(3)
+            if cuda_version and opencl_version:
+                break
 
-        opencl_version = re.search(r'OpenCL API\s*\(([^)]+)\)', output)
+        cuda_value = cuda_version or cuda_api
+        if cuda_value:
+            info['cuda_version'] = cls._ensure_text(cuda_value).strip()
         if opencl_version:
-            info['opencl_version'] = opencl_version.group(1).strip()
+            info['opencl_version'] = cls._ensure_text(opencl_version).strip()
 
         current_device = None
         last_name = None
         pending_gpu = False
-        for line in output.splitlines():
-            stripped = line.strip()
-            if not stripped:
-                continue
+        for match in _RE_GPU_LINES.finditer(output):
+            label = match.group(1)
+            stripped = cls._ensure_text(match.group(0)).strip()
 
-            if stripped.startswith('Backend Device ID') or stripped.startswith('Device #'):
+            if label in (b'Backend Device ID', b'Device #'):
                 current_device = None
                 last_name = None
                 pending_gpu = False
                 continue
 
-            if stripped.startswith('Name'):
-                value = stripped.split(':', 1)[1].strip()
+            if label == b'Name':
+                value = stripped.partition(':')[2].strip()
                 last_name = value
                 lowered = value.lower()
                 # Skip platform names (e.g. "NVIDIA CUDA", "Portable Computing Language")
@@ -128,48 +241,85 @@ class Hashcat(Dependency):
                     info['available'] = True
                     info['gpu_name'] = current_device
                     break
+                continue
 
-            if stripped.startswith('Device Type'):
-                type_value = stripped.split(':', 1)[1].strip().upper()
-                is_gpu = 'GPU' in type_value
-                pending_gpu = is_gpu
-                if is_gpu:
-                    if current_device:
-                        info['available'] = True
-                        info['gpu_name'] = current_device
-                    elif last_name:
-                        info['available'] = True
-                        info['gpu_name'] = last_name
-                    if info['available']:
-                        break
-
-            if stripped.startswith('Type'):
-                type_value = stripped.split(':', 1)[1].strip().upper()
-                is_gpu = 'GPU' in type_value
-                pending_gpu = is_gpu
-                if is_gpu:
-                    if current_device:
-                        info['available'] = True
-                        info['gpu_name'] = current_device
-                    elif last_name:
-                        info['available'] = True
-                        info['gpu_name'] = last_name
-                    if info['available']:
-                        break
+            # "Device Type" (newer hashcat) or "Type" (older hashcat)
+            type_value = stripped.partition(':')[2].strip().upper()
+            is_gpu = 'GPU' in type_value
+            pending_gpu = is_gpu
+            if is_gpu:
+                if current_device:
+                    info['available'] = True
+                    info['gpu_name'] = current_device
+                elif last_name:
+                    info['available'] = True
+                    info['gpu_name'] = last_name
+                if info['available']:
+                    break
 
         return info
 
-    @staticmethod
-    def _resolve_bruteforce_options(overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    @classmethod
+    def _get_gpu_device_ids(cls) -> List[int]:
+        """
+        Return the IDs of the distinct GPU devices listed by `hashcat -I`.
+        Alias entries (one GPU seen through two backends) and skipped devices
+        are left out; an empty list is returned if the query fails.
+        """
+        try:
+            output = cls._run_hashcat_info()
+        except Exception:
+            return []
+
+        devices: List[int] = []
+        aliased = set()
+        gpu_section = False
+        candidate = None
+        for match in _RE_DEVICE_LINES.finditer(output):
+            section, device_id, rest, type_value = match.groups()
+            if section is not None:
+                # CUDA/HIP/Metal devices carry no type line; they are always GPUs.
+                gpu_section = section != b'OpenCL'
+                candidate = None
+            elif device_id is not None:
+                candidate = int(device_id)
+                alias = _RE_DEVICE_ALIAS.search(rest)
+                if candidate in aliased or b'skipped' in rest or (alias and int(alias.group(1)) in devices):
+                    candidate = None
+                    continue
+                if alias:
+                    aliased.add(int(alias.group(1)))
+                if gpu_section:
+                    devices.append(candidate)
+                    candidate = None
+            elif candidate is not None and b'GPU' in type_value.upper():
+                devices.append(candidate)
+                candidate = None
+        return devices
+
+    @classmethod
+    def _resolve_bruteforce_options(cls, overrides: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
         """Normalize brute-force configuration into a dict with consistent keys."""
+        mode_value = getattr(Configuration, 'brute_force_mode', '0')
+        raw_key = (
+            getattr(Configuration, 'use_brute_force', False),
+            getattr(Configuration, 'brute_force_mask', None),
+            getattr(Configuration, 'brute_force_timeout', 0),
+            tuple(mode_value) if isinstance(mode_value, (list, tuple, set)) else mode_value,
+        )
+        cached = cls._bruteforce_cache
+        if not overrides and cached is not None and cached[0] == raw_key:
+            options = dict(cached[1])
+            options['modes'] = list(options['modes'])
+            return options
+
         options = {
-            'enabled': getattr(Configuration, 'use_brute_force', False),
+            'enabled': raw_key[0],
             'modes': [],
-            'mask': getattr(Configuration, 'brute_force_mask', None),
-            'timeout_seconds': getattr(Configuration, 'brute_force_timeout', 0),
+            'mask': raw_key[1],
+            'timeout_seconds': raw_key[2],
         }
 
-        mode_value = getattr(Configuration, 'brute_force_mode', '0')
         modes: List[str] = []
         if isinstance(mode_value, str):
             modes = [entry.strip() for entry in mode_value.split(',') if entry.strip()]
@@ -185,59 +335,118 @@ class Hashcat(Dependency):
                     options[key] = value
 
         if not options.get('mask'):
-            options['mask'] = '?d?d?d?d?d?d?d?d'
+            options['mask'] = _DEFAULT_MASK
 
         timeout = options.get('timeout_seconds')
         if isinstance(timeout, (int, float)) and timeout < 0:
             options['timeout_seconds'] = 0
 
+        if not overrides:
+            cls._bruteforce_cache = (raw_key, dict(options, modes=list(modes)))
+
         return options
 
     @staticmethod
-    def _build_hashcat_tasks(wordlists: List[str], brute_options: Dict[str, Any]) -> List[Dict[str, Any]]:
-        """Construct hashcat attack tasks based on wordlists and brute-force options."""
+    def _build_hashcat_tasks(
+            wordlists: List[str],
+            brute_options: Dict[str, Any],
+            combine_dictionaries: bool = False) -> List[Dict[str, Any]]:
+        """
+        Construct hashcat attack tasks based on wordlists and brute-force options.
+        With `combine_dictionaries`, straight dictionary attacks become a single
+        task listing every wordlist (hashcat -a 0 accepts several), so hashcat
+        starts and autotunes once instead of once per wordlist.
+        """
         tasks: List[Dict[str, Any]] = []
-        cleaned_wordlists = [os.path.abspath(path) for path in wordlists if path]
+        # Resolve relative paths against a single getcwd() instead of one per abspath() call.
+        cwd = os.getcwd()
+        cleaned_wordlists = [path if os.path.isabs(path) else os.path.join(cwd, path) for path in wordlists if path]
 
         enabled = bool(brute_options.get('enabled'))
         modes = [mode for mode in brute_options.get('modes', []) if mode]
-        mask = brute_options.get('mask') or '?d?d?d?d?d?d?d?d'
+        mask = brute_options.get('mask') or _DEFAULT_MASK
         timeout_seconds = brute_options.get('timeout_seconds')
         options = {
             'timeout_seconds': timeout_seconds
         }
 
-        if not enabled:
-            if not cleaned_wordlists:
-                raise FileNotFoundError("No wordlists provided for dictionary attack.")
+        def add_dictionary_tasks():
+            if combine_dictionaries:
+                tasks.append({'mode': '0', 'wordlist': cleaned_wordlists[0], 'wordlists': list(cleaned_wordlists),
+                              'mask': None, 'options': options})
+                return
             for path in cleaned_wordlists:
                 tasks.append({'mode': '0', 'wordlist': path, 'mask': None, 'options': options})
-            return tasks
 
-        if not modes:
+        if not enabled or not modes:
             if not cleaned_wordlists:
                 raise FileNotFoundError("No wordlists provided for dictionary attack.")
-            for path in cleaned_wordlists:
-                tasks.append({'mode': '0', 'wordlist': path, 'mask': None, 'options': options})
-            return tasks
-
-        dictionary_required = any(mode in {'0', '6', '7'} for mode in modes)
-        if dictionary_required and not cleaned_wordlists:
-            raise FileNotFoundError("Selected brute-force modes require a wordlist, but none were provided.")
-
-        for raw_mode in modes:
-            mode = raw_mode.strip()
-            if mode == '3':
-                tasks.append({'mode': '3', 'wordlist': None, 'mask': mask, 'options': options})
-            elif mode in {'6', '7'}:
-                for path in cleaned_wordlists:
-                    tasks.append({'mode': mode, 'wordlist': path, 'mask': mask, 'options': options})
-            else:
-                for path in cleaned_wordlists:
-                    tasks.append({'mode': '0', 'wordlist': path, 'mask': None, 'options': options})
+            add_dictionary_tasks()
+        else:
+            dictionary_required = any(mode in {'0', '6', '7'} for mode in modes)
+            if dictionary_required and not cleaned_wordlists:
+                raise FileNotFoundError("Selected brute-force modes require a wordlist, but none were provided.")
+
+            for raw_mode in modes:
+                mode = raw_mode.strip()
+                if mode == '3':
+                    # A pure mask attack on CPU takes orders of magnitude longer than on
+                    # a GPU; skip it rather than hold hashcat for the whole timeout.
+                    # The section-aware device list also sees CUDA/HIP/Metal GPUs.
+                    if getattr(Configuration, 'brute_force_require_gpu', True) and not Hashcat._get_gpu_device_ids():
+                        Color.pl('{!} {O}Brute force (mask attack) requires a GPU; {R}skipping{W}')
+                        continue
+                    tasks.append({'mode': '3', 'wordlist': None, 'mask': mask, 'options': options})
+                elif mode in {'6', '7'}:
+                    for path in cleaned_wordlists:
+                        tasks.append({'mode': mode, 'wordlist': path, 'mask': mask, 'options': options})
+                else:
+                    add_dictionary_tasks()
+
+        # Assign per-task session and outfile names here so the runner does not have to.
+        for task in tasks:
+            Hashcat._assign_task_files(task)
 
         return tasks
 
+    @staticmethod
+    def _assign_task_files(task: Dict[str, Any]) -> Dict[str, Any]:
+        """Give a task its own hashcat session name and key outfile."""
+        token = uuid.uuid4().hex
+        task['session'] = f'wifitex_{token[:12]}'
+        task['key_file'] = os.path.join(Configuration.temp(), f'hashcat_cli_{token}.key')
+        return task
+
+    @staticmethod
+    def _device_lanes(tasks: List[Dict[str, Any]]) -> List[List[Dict[str, Any]]]:
+        """
+        Group tasks into lanes that may run concurrently. With
+        `Configuration.hashcat_multi_device` and several GPUs there is one lane
+        per device: combined wordlists are dealt round-robin into disjoint
+        shards and every task is pinned to its device with `-d`. Otherwise
+        all tasks share one lane and run one after another, since two
+        hashcats on the same device only compete for it.
+        """
+        devices = Hashcat._get_gpu_device_ids() if getattr(Configuration, 'hashcat_multi_device', False) else []
+        if len(devices) < 2:
+            return [list(tasks)]
+
+        sharded: List[Dict[str, Any]] = []
+        for task in tasks:
+            wordlists = task.get('wordlists') or []
+            if len(wordlists) < 2:
+                sharded.append(task)
+                continue
+            for offset in range(min(len(devices), len(wordlists))):
+                shard = wordlists[offset::len(devices)]
+                sharded.append(Hashcat._assign_task_files(dict(task, wordlist=shard[0], wordlists=shard)))
+
+        lanes: List[List[Dict[str, Any]]] = [[] for _ in devices]
+        for index, task in enumerate(sharded):
+            lane = index % len(devices)
+            lanes[lane].append(dict(task, device=devices[lane]))
+        return [lane for lane in lanes if lane]
+
     @staticmethod
     def _prepare_hash_input(handshake_or_path, show_command: bool = False):
         """
@@ -247,8 +456,8 @@ class Hashcat(Dependency):
         """
         temporary_input: Optional[str] = None
 
-        if hasattr(handshake_or_path, 'capfile'):
-            cap_path = handshake_or_path.capfile
+        cap_path = getattr(handshake_or_path, 'capfile', None)
+        if cap_path is not None:
             handshake = handshake_or_path
         else:
             cap_path = str(handshake_or_path)
@@ -271,23 +480,31 @@ class Hashcat(Dependency):
             hash_input: str,
             hash_mode: str,
             task: Dict[str, Any],
-            show_command: bool = False):
-        """Execute a single hashcat task and return (return_code, key)."""
+            show_command: bool = False,
+            processes: Optional[List[Process]] = None,
+            use_force: Optional[bool] = None):
+        """
+        Execute a single hashcat task and return (return_code, key).
+        The spawned process is appended to `processes` (if given) so a caller
+        running several tasks can interrupt it. `use_force` lets callers that
+        run many tasks resolve `should_use_force()` once.
+        """
         attack_mode = task.get('mode', '0')
         wordlist = task.get('wordlist')
-        mask = task.get('mask') or '?d?d?d?d?d?d?d?d'
+        mask = task.get('mask') or _DEFAULT_MASK
         options = task.get('options') or {}
         runtime_seconds = options.get('timeout_seconds')
 
-        key_file = os.path.join(Configuration.temp(), f'hashcat_cli_{uuid.uuid4().hex}.key')
+        key_file = task.get('key_file')
+        if not key_file:
+            key_file = os.path.join(Configuration.temp(), f'hashcat_cli_{uuid.uuid4().hex}.key')
 
         command = ['hashcat', '--quiet', '-m', hash_mode, '-a', attack_mode, hash_input]
 
-        session_name = task.get('session') if task else None
+        session_name = task.get('session')
         if not session_name:
             session_name = f"wifitex_{uuid.uuid4().hex[:12]}"
-            if isinstance(task, dict):
-                task['session'] = session_name
+            task['session'] = session_name
 
         if attack_mode == '3':
             command.append(mask)
@@ -302,10 +519,24 @@ class Hashcat(Dependency):
         else:
             if not wordlist:
                 raise ValueError('Hashcat dictionary mode requires a wordlist.')
-            command.append(wordlist)
+            command.extend(task.get('wordlists') or [wordlist])
 
         command.extend(['--outfile', key_file, '--outfile-format', '2'])
         command.extend(['--session', session_name])
+        command.extend(Hashcat._potfile_args())
+
+        workload = getattr(Configuration, 'hashcat_workload_profile', 3)
+        if workload:
+            command.extend(['-w', str(workload)])
+        # Host-side candidate generation keeps the GPU fed on slow WPA hashes with
+        # small wordlists; for pure mask attacks GPU-side generation is faster.
+        if attack_mode == '0' and hash_mode in ('22000', '16800') \
+                and getattr(Configuration, 'hashcat_slow_candidates', True):
+            command.append('-S')
+
+        device = task.get('device')
+        if device:
+            command.extend(['-d', str(device)])
 
         if runtime_seconds:
             try:
@@ -315,28 +546,36 @@ class Hashcat(Dependency):
             except (TypeError, ValueError):
                 pass
 
-        if Hashcat.should_use_force():
+        if use_force is None:
+            use_force = Hashcat.should_use_force()
+        if use_force:
             command.append('--force')
 
         if show_command:
-            Color.pl('{+} {D}Running: {W}{P}%s{W}' % ' '.join(command))
+            Color.pl('{+} {D}Running: {W}{P}%s{W}' % _format_command(command))
 
         process = Process(command)
+        if processes is not None:
+            processes.append(process)
         stdout = Hashcat._ensure_text(process.stdout())
         stderr = Hashcat._ensure_text(process.stderr())
         return_code = process.pid.returncode
 
         key_value: Optional[str] = None
         try:
-            if os.path.exists(key_file):
-                with open(key_file, 'r', encoding='utf-8', errors='ignore') as key_fd:
-                    key_value = key_fd.readline().strip()
+            # Only the first line is needed; a WPA key (even $HEX[...] encoded)
+            # fits well within a single small read.
+            key_fd = os.open(key_file, os.O_RDONLY)
+            try:
+                key_buffer = os.read(key_fd, 512)
+            finally:
+                os.close(key_fd)
+            key_value = key_buffer.split(b'\n', 1)[0].decode('utf-8', 'ignore').strip()
+        except FileNotFoundError:
+            pass
         finally:
-            if os.path.exists(key_file):
-                try:
-                    os.remove(key_file)
-                except Exception:
-                    pass
+            with contextlib.suppress(OSError):
+                os.unlink(key_file)
 
         if return_code not in (0, 1):
             combined = (stdout or '').strip()
@@ -347,24 +586,102 @@ class Hashcat(Dependency):
         return return_code, key_value
 
     @staticmethod
-    def _run_hashcat_show(hash_input: str, hash_mode: str, show_command: bool = False) -> Optional[str]:
+    def _run_hashcat_tasks(
+            hash_input: str,
+            hash_mode: str,
+            tasks: List[Dict[str, Any]],
+            show_command: bool = False,
+            use_force: Optional[bool] = None) -> Optional[str]:
+        """
+        Run hashcat tasks and return the first recovered key, or None.
+        Tasks run one at a time, except when sharded across GPUs where each
+        device's lane runs concurrently (see `_device_lanes`); once one lane
+        recovers the key, the other lanes' hashcats are interrupted.
+        """
+        if use_force is None:
+            use_force = Hashcat.should_use_force()
+        lanes = Hashcat._device_lanes(tasks)
+        if len(lanes) <= 1:
+            for task in (lanes[0] if lanes else []):
+                _, key_value = Hashcat._run_hashcat_task(
+                    hash_input, hash_mode, task, show_command=show_command, use_force=use_force)
+                if key_value:
+                    return key_value
+            return None
+
+        processes: List[Process] = []
+        stop = threading.Event()
+
+        def run_lane(lane):
+            for task in lane:
+                if stop.is_set():
+                    break
+                _, lane_key = Hashcat._run_hashcat_task(
+                    hash_input, hash_mode, task, show_command, processes, use_force)
+                if lane_key:
+                    return lane_key
+            return None
+
+        futures = []
+        key_value: Optional[str] = None
+        # Several lanes only exist when each is pinned to its own device.
+        # Threads suffice: the actual work happens in the hashcat processes.
+        with ThreadPoolExecutor(max_workers=len(lanes)) as executor:
+            for lane in lanes:
+                futures.append(executor.submit(run_lane, lane))
+            try:
+                for future in as_completed(futures):
+                    key_value = future.result()
+                    if key_value:
+                        break
+            finally:
+                stop.set()
+                for future in futures:
+                    future.cancel()
+                # A worker may still be spawning hashcat, so keep interrupting until all are done.
+                while not all(future.done() for future in futures):
+                    for process in list(processes):
+                        if process.poll() is None:
+                            process.interrupt()
+                    wait(futures, timeout=0.5)
+
+        return key_value or None
+
+    @staticmethod
+    def _potfile_args() -> List[str]:
+        """
+        `--potfile-path` arguments for the configured potfile, if any. The same
+        file must back both the attack runs and the up-front `--show` lookup,
+        otherwise keys cracked earlier are cracked again.
+        """
+        potfile = getattr(Configuration, 'hashcat_potfile', None)
+        if not potfile:
+            return []
+        return ['--potfile-path', os.path.abspath(potfile)]
+
+    @staticmethod
+    def _run_hashcat_show(
+            hash_input: str,
+            hash_mode: str,
+            show_command: bool = False,
+            use_force: Optional[bool] = None) -> Optional[str]:
         """Attempt to extract a cracked key from the potfile."""
         command = ['hashcat', '--quiet', '--show', '-m', hash_mode, hash_input]
-        if Hashcat.should_use_force():
+        command.extend(Hashcat._potfile_args())
+        if use_force is None:
+            use_force = Hashcat.should_use_force()
+        if use_force:
             command.append('--force')
         if show_command:
-            Color.pl('{+} {D}Running: {W}{P}%s{W}' % ' '.join(command))
+            Color.pl('{+} {D}Running: {W}{P}%s{W}' % _format_command(command))
         process = Process(command)
-        stdout = Hashcat._ensure_text(process.stdout()) or ''
-        if not stdout:
-            return None
-        lines = [line.strip() for line in stdout.splitlines() if line.strip()]
-        if not lines:
+        stdout = Hashcat._ensure_text(process.stdout()).strip()
+        # The key follows the last ':' of the last non-empty line.
+        last_line = stdout.rpartition('\n')[2]
+        _, separator, key = last_line.rpartition(':')
+        if not separator:
             return None
-        last_line = lines[-1]
-        if ':' not in last_line:
-            return None
-        return last_line.rsplit(':', 1)[-1].strip() or None
+        return key.strip() or None
 
     @classmethod
     def get_performance_info(cls) -> Dict[str, Any]:
@@ -386,9 +703,10 @@ class Hashcat(Dependency):
         try:
             # Benchmark the WPA2/PMKID hash-mode (22000) which hashcat uses for WPA cracking.
             benchmark_cmd = ['hashcat', '-b', '-m', '22000']
-            proc = Process(benchmark_cmd)
-            stdout = Hashcat._ensure_text(proc.stdout())
-            stderr = Hashcat._ensure_text(proc.stderr())
+            completed = subprocess.run(benchmark_cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                       timeout=cls._BENCHMARK_TIMEOUT)
+            stdout = Hashcat._ensure_text(completed.stdout)
+            stderr = Hashcat._ensure_text(completed.stderr)
             combined = f'{stdout}\n{stderr}'.strip()
             result['raw_output'] = combined
 
@@ -399,9 +717,9 @@ class Hashcat(Dependency):
                 result['success'] = True
             else:
                 # If speed not found, still mark success if command executed without errors.
-                result['success'] = proc.pid.returncode == 0
+                result['success'] = completed.returncode == 0
                 if not result['success']:
-                    result['error'] = f'Benchmark exited with code {proc.pid.returncode}'
+                    result['error'] = f'Benchmark exited with code {completed.returncode}'
         except Exception as exc:
             result['raw_output'] = f'Error running hashcat benchmark: {exc}'
             result['error'] = str(exc)
@@ -417,34 +735,37 @@ class Hashcat(Dependency):
         """Crack a captured WPA/WPA2 handshake using hashcat."""
         wordlist_paths: List[str] = []
         if wordlists:
-            wordlist_paths.extend([os.path.abspath(path) for path in wordlists if path])
+            wordlist_paths.extend(wordlists)
         elif wordlist:
-            wordlist_paths.append(os.path.abspath(wordlist))
+            wordlist_paths.append(wordlist)
         elif Configuration.wordlist:
-            wordlist_paths.append(os.path.abspath(Configuration.wordlist))
+            wordlist_paths.append(Configuration.wordlist)
 
         brute_options = Hashcat._resolve_bruteforce_options()
         try:
-            tasks = Hashcat._build_hashcat_tasks(wordlist_paths, brute_options)
+            tasks = Hashcat._build_hashcat_tasks(wordlist_paths, brute_options, combine_dictionaries=True)
         except FileNotFoundError as exc:
             raise ValueError(str(exc)) from exc
 
+        # Overlap hashcat's device probe (needed for --force) with the capture conversion.
+        Hashcat._prime_hashcat_info()
         hash_input, hash_mode, temporary_input = Hashcat._prepare_hash_input(handshake, show_command=show_command)
         try:
-            for task in tasks:
-                _, key_value = Hashcat._run_hashcat_task(hash_input, hash_mode, task, show_command=show_command)
-                if key_value:
-                    return key_value
+            use_force = Hashcat.should_use_force()
+            # A potfile hit makes every attack task redundant, so look it up once up front.
+            key_value = Hashcat._run_hashcat_show(
+                hash_input, hash_mode, show_command=show_command, use_force=use_force)
+            if key_value:
+                return key_value
 
-            key_value = Hashcat._run_hashcat_show(hash_input, hash_mode, show_command=show_command)
+            key_value = Hashcat._run_hashcat_tasks(
+                hash_input, hash_mode, tasks, show_command=show_command, use_force=use_force)
             if key_value:
                 return key_value
         finally:
-            if temporary_input and os.path.exists(temporary_input):
-                try:
-                    os.remove(temporary_input)
-                except Exception:
-                    pass
+            if temporary_input:
+                with contextlib.suppress(OSError):
+                    os.unlink(temporary_input)
 
         return None
 
@@ -463,15 +784,15 @@ class Hashcat(Dependency):
 
         wordlist_paths: List[str] = []
         if wordlists:
-            wordlist_paths.extend([os.path.abspath(path) for path in wordlists if path])
+            wordlist_paths.extend(wordlists)
         elif wordlist:
-            wordlist_paths.append(os.path.abspath(wordlist))
+            wordlist_paths.append(wordlist)
         elif Configuration.wordlist:
-            wordlist_paths.append(os.path.abspath(Configuration.wordlist))
+            wordlist_paths.append(Configuration.wordlist)
 
         brute_options = Hashcat._resolve_bruteforce_options()
         try:
-            tasks = Hashcat._build_hashcat_tasks(wordlist_paths, brute_options)
+            tasks = Hashcat._build_hashcat_tasks(wordlist_paths, brute_options, combine_dictionaries=True)
         except FileNotFoundError as exc:
             raise ValueError(str(exc)) from exc
 
@@ -482,12 +803,75 @@ class Hashcat(Dependency):
         else:
             hash_mode = '22000'
 
-        for task in tasks:
-            _, key_value = Hashcat._run_hashcat_task(hash_input, hash_mode, task, show_command=verbose)
+        use_force = Hashcat.should_use_force()
+        # A potfile hit makes every attack task redundant, so look it up once up front.
+        key_value = Hashcat._run_hashcat_show(hash_input, hash_mode, show_command=verbose, use_force=use_force)
+        if key_value:
+            return key_value
+
+        return Hashcat._run_hashcat_tasks(hash_input, hash_mode, tasks, show_command=verbose, use_force=use_force)
+
+    @staticmethod
+    def crack_pmkid_files(
+            pmkid_files: List[str],
+            verbose: bool = False,
+            wordlists: Optional[List[str]] = None) -> Dict[str, Optional[str]]:
+        '''
+        Cracks several PMKID hash files together. Mode 22000 hash files may hold
+        many hashes, so the .22000 inputs are merged and every attack task runs
+        once for all of them; hashcat startup and autotune are paid once instead
+        of once per target. Keys are then read back per file from the potfile.
+        Returns:
+            Dict mapping each pmkid_file to its key, or `None` if not found.
+        '''
+        results: Dict[str, Optional[str]] = {}
+        pending: List[str] = []
+        use_force = Hashcat.should_use_force()
+        for pmkid_file in pmkid_files:
+            hash_input = os.path.abspath(pmkid_file)
+            if not hash_input.lower().endswith('.22000'):
+                # Legacy 16800 hashes cannot share a run with 22000 ones.
+                results[pmkid_file] = Hashcat.crack_pmkid(pmkid_file, verbose=verbose, wordlists=wordlists)
+                continue
+            key_value = Hashcat._run_hashcat_show(hash_input, '22000', show_command=verbose, use_force=use_force)
             if key_value:
-                return key_value
+                results[pmkid_file] = key_value
+            else:
+                pending.append(pmkid_file)
 
-        return Hashcat._run_hashcat_show(hash_input, hash_mode, show_command=verbose)
+        if len(pending) == 1:
+            results[pending[0]] = Hashcat.crack_pmkid(pending[0], verbose=verbose, wordlists=wordlists)
+            return results
+        if not pending:
+            return results
+
+        brute_options = Hashcat._resolve_bruteforce_options()
+        try:
+            tasks = Hashcat._build_hashcat_tasks(
+                wordlists or [Configuration.wordlist], brute_options, combine_dictionaries=True)
+        except FileNotFoundError as exc:
+            raise ValueError(str(exc)) from exc
+
+        merged_input = Configuration.temp('pmkid-batch.22000')
+        with open(merged_input, 'w') as merged:
+            for pmkid_file in pending:
+                with open(pmkid_file, 'r') as hash_handle:
+                    hashes = hash_handle.read().strip()
+                if hashes:
+                    merged.write(hashes + '\n')
+
+        try:
+            # Every task must run: hashcat itself stops early once all hashes are cracked.
+            for task in tasks:
+                Hashcat._run_hashcat_task(merged_input, '22000', task, show_command=verbose, use_force=use_force)
+        finally:
+            with contextlib.suppress(OSError):
+                os.unlink(merged_input)
+
+        for pmkid_file in pending:
+            results[pmkid_file] = Hashcat._run_hashcat_show(
+                os.path.abspath(pmkid_file), '22000', show_command=verbose, use_force=use_force)
+        return results
 
 
 class HcxDumpTool(Dependency):
@@ -495,14 +879,19 @@ class HcxDumpTool(Dependency):
     dependency_name = 'hcxdumptool'
     dependency_url = 'https://github.com/ZerBea/hcxdumptool'
 
+    _last_filterlist_bssid: Optional[str] = None
+
     def __init__(self, target, pcapng_file):
-        # Create filterlist
+        # Create filterlist (rewritten only when the target changes)
         filterlist = Configuration.temp('pmkid.filterlist')
-        with open(filterlist, 'w') as filter_handle:
-            filter_handle.write(target.bssid.replace(':', ''))
+        bssid_hex = target.bssid.replace(':', '')
+        if bssid_hex != HcxDumpTool._last_filterlist_bssid or not os.path.exists(filterlist):
+            with open(filterlist, 'w') as filter_handle:
+                filter_handle.write(bssid_hex)
+            HcxDumpTool._last_filterlist_bssid = bssid_hex
 
-        if os.path.exists(pcapng_file):
-            os.remove(pcapng_file)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(pcapng_file)
 
         command = [
             'hcxdumptool',
@@ -525,6 +914,9 @@ class HcxPcapTool(Dependency):
     dependency_name = 'hcxpcaptool'
     dependency_url = 'https://github.com/ZerBea/hcxtools'
 
+    # hcxpcapngtool output meaning the capture holds no crackable material.
+    _NO_HASHES_MARKERS = ('no hashes written', 'no valid')
+
     def __init__(self, target):
         self.target = target
         self.bssid = self.target.bssid.lower().replace(':', '')
@@ -533,8 +925,8 @@ class HcxPcapTool(Dependency):
     @staticmethod
     def generate_hccapx_file(handshake, show_command=False):
         hccapx_file = Configuration.temp('generated.hccapx')
-        if os.path.exists(hccapx_file):
-            os.remove(hccapx_file)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(hccapx_file)
 
         command = [
             'hcxpcaptool',
@@ -543,7 +935,7 @@ class HcxPcapTool(Dependency):
         ]
 
         if show_command:
-            Color.pl('{+} {D}Running: {W}{P}%s{W}' % ' '.join(command))
+            Color.pl('{+} {D}Running: {W}{P}%s{W}' % _format_command(command))
 
         process = Process(command)
         stdout, stderr = process.get_output()
@@ -556,39 +948,43 @@ class HcxPcapTool(Dependency):
     @staticmethod
     def generate_22000_file(handshake, show_command=False):
         hash_file = Configuration.temp('generated.22000')
-        if os.path.exists(hash_file):
-            os.remove(hash_file)
-
-        commands = [
-            ['hcxpcapngtool', '-o', hash_file, handshake.capfile],
-            ['hcxpcapngtool', '--hashcat', hash_file, handshake.capfile],
-        ]
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(hash_file)
 
         errors = []
-        for command in commands:
+        # `-o` is the modern flag; `--hashcat` is only tried for older hcxtools builds.
+        for output_flag in ('-o', '--hashcat'):
+            command = ['hcxpcapngtool', output_flag, hash_file, handshake.capfile]
             if show_command:
-                Color.pl('{+} {D}Running: {W}{P}%s{W}' % ' '.join(command))
+                Color.pl('{+} {D}Running: {W}{P}%s{W}' % _format_command(command))
 
             process = Process(command)
             stdout, stderr = process.get_output()
-            if os.path.exists(hash_file) and os.path.getsize(hash_file) > 0:
-                return hash_file
+            try:
+                if os.path.getsize(hash_file) > 0:
+                    return hash_file
+            except OSError:
+                pass
 
+            stdout = Hashcat._ensure_text(stdout)
+            stderr = Hashcat._ensure_text(stderr)
             errors.append('Command: {0}\nStdout: {1}\nStderr: {2}'.format(
-                ' '.join(command),
-                Hashcat._ensure_text(stdout),
-                Hashcat._ensure_text(stderr),
-            ))
-            if os.path.exists(hash_file):
-                os.remove(hash_file)
+                _format_command(command), stdout, stderr))
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(hash_file)
+
+            # The capture itself has nothing usable; a different output flag will not help.
+            output = ('%s\n%s' % (stdout, stderr)).lower()
+            if any(marker in output for marker in HcxPcapTool._NO_HASHES_MARKERS):
+                break
 
         raise ValueError('Failed to generate .22000 file, output:\n%s' % '\n\n'.join(errors))
 
     @staticmethod
     def generate_john_file(handshake, show_command=False):
         john_file = Configuration.temp('generated.john')
-        if os.path.exists(john_file):
-            os.remove(john_file)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(john_file)
 
         command = [
             'hcxpcaptool',
@@ -597,7 +993,7 @@ class HcxPcapTool(Dependency):
         ]
 
         if show_command:
-            Color.pl('{+} {D}Running: {W}{P}%s{W}' % ' '.join(command))
+            Color.pl('{+} {D}Running: {W}{P}%s{W}' % _format_command(command))
 
         process = Process(command)
         stdout, stderr = process.get_output()
@@ -608,8 +1004,8 @@ class HcxPcapTool(Dependency):
         return john_file
 
     def get_pmkid_hash(self, pcapng_file):
-        if os.path.exists(self.pmkid_file):
-            os.remove(self.pmkid_file)
+        with contextlib.suppress(FileNotFoundError):
+            os.unlink(self.pmkid_file)
 
         command = [
             'hcxpcapngtool',
@@ -619,23 +1015,22 @@ class HcxPcapTool(Dependency):
         hcxpcap_proc = Process(command)
         hcxpcap_proc.wait()
 
-        if not os.path.exists(self.pmkid_file):
-            return None
-
-        with open(self.pmkid_file, 'r') as f:
-            output = f.read()
-            # Each line looks like:
-            # hashcat hash format v22000
-
         # Note: The dumptool will record *anything* it finds, ignoring the filterlist.
-        # Check that we got the right target (filter by BSSID)
+        # Check that we got the right target (filter by BSSID), stopping at the first match.
+        # Lines are `pmkid*bssid*station*essid`; one case-insensitive regex scan over
+        # the whole file finds the target line without splitting every line.
+        target_re = re.compile(
+            rb'^[0-9a-f]+\*' + re.escape(self.bssid.encode('ascii')) + rb'\*[^\r\n]*', re.I | re.M)
         matching_pmkid_hash = None
-        for line in output.split('\n'):
-            fields = line.split('*')
-            if len(fields) >= 3 and fields[1].lower() == self.bssid:
-                # Found it
-                matching_pmkid_hash = line
-                break
+        try:
+            with open(self.pmkid_file, 'rb') as f:
+                match = target_re.search(f.read())
+        except FileNotFoundError:
+            return None
+        if match:
+            # Found it
+            matching_pmkid_hash = match.group(0).decode('utf-8', errors='ignore')
 
-        os.remove(self.pmkid_file)
+        with contextlib.suppress(OSError):
+            os.unlink(self.pmkid_file)
         return matching_pmkid_hash
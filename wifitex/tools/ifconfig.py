@@ -5,6 +5,9 @@ import re
 
 from .dependency import Dependency
 
+_MAC_COLON_RE = re.compile(r' ((?:[a-zA-Z0-9]{2}:){5}[a-zA-Z0-9]{2})')
+_MAC_DASH_RE = re.compile(r' ((?:[a-zA-Z0-9]{2}-){5}[a-zA-Z0-9]{2})')
+
 class Ifconfig(Dependency):
     dependency_required = True
     dependency_name = 'ifconfig'
@@ -25,9 +28,10 @@ class Ifconfig(Dependency):
         command.append('up')
 
         pid = Process(command)
-        pid.wait()
+        # One communicate() collects both streams once the command has exited
+        stdout, stderr = pid.get_output()
         if pid.poll() != 0:
-            raise Exception('Error putting interface %s up:\n%s\n%s' % (interface, pid.stdout(), pid.stderr()))
+            raise Exception('Error putting interface %s up:\n%s\n%s' % (interface, stdout, stderr))
 
 
     @classmethod
@@ -36,31 +40,29 @@ class Ifconfig(Dependency):
         from ..util.process import Process
 
         pid = Process(['ifconfig', interface, 'down'])
-        pid.wait()
+        stdout, stderr = pid.get_output()
         if pid.poll() != 0:
-            raise Exception('Error putting interface %s down:\n%s\n%s' % (interface, pid.stdout(), pid.stderr()))
+            raise Exception('Error putting interface %s down:\n%s\n%s' % (interface, stdout, stderr))
 
 
     @classmethod
     def get_mac(cls, interface):
         from ..util.process import Process
 
-        raw_output = Process(['ifconfig', interface]).stdout()
-        if raw_output is None:
+        # A plain call: the command runs to completion and is read once, untracked
+        output, _ = Process.call(['ifconfig', interface])
+        if not output:
             raise Exception('No output received from ifconfig for %s' % interface)
-        output = raw_output.decode('utf-8', errors='ignore') if isinstance(raw_output, bytes) else str(raw_output)
 
-        # Mac address separated by dashes
-        mac_dash_regex = ('[a-zA-Z0-9]{2}-' * 6)[:-1]
-        match = re.search(' ({})'.format(mac_dash_regex), output)
+        # Mac address separated by colons (the usual Linux `ether` line)
+        match = _MAC_COLON_RE.search(output)
         if match:
-            return match.group(1).replace('-', ':')
+            return match.group(1)
 
-        # Mac address separated by colons
-        mac_colon_regex = ('[a-zA-Z0-9]{2}:' * 6)[:-1]
-        match = re.search(' ({})'.format(mac_colon_regex), output)
+        # Mac address separated by dashes
+        match = _MAC_DASH_RE.search(output)
         if match:
-            return match.group(1)
+            return match.group(1).replace('-', ':')
 
         raise Exception('Could not find the mac address for %s' % interface)
 
@@ -5,9 +5,12 @@ from .dependency import Dependency
 from ..config import Configuration
 from ..util.color import Color
 from ..util.process import Process
-from ..tools.hashcat import HcxPcapTool
 
+import contextlib
 import os
+import re
+
+_RE_GPU_FORMAT = re.compile(r'wpapsk-(opencl|cuda)')
 
 
 class John(Dependency):
@@ -16,27 +19,108 @@ class John(Dependency):
     dependency_name = 'john'
     dependency_url = 'http://www.openwall.com/john/'
 
+    # John's format list does not change during a run (see `_detect_format`).
+    _format_cache = None
+
+    @classmethod
+    def _detect_format(cls):
+        ''' Returns the WPA format to use: OpenCL or CUDA if supported, else CPU '''
+        if cls._format_cache is not None:
+            return cls._format_cache
+
+        # Use `john --list=formats` to find if OpenCL or CUDA is supported.
+        formats_raw = Process(['john', '--list=formats']).stdout()
+        if isinstance(formats_raw, bytes):
+            formats_stdout = formats_raw.decode('utf-8', errors='ignore')
+        else:
+            formats_stdout = formats_raw or ''
+        # One scan of the (long) format list; OpenCL wins over CUDA wherever it appears.
+        john_format = 'wpapsk'
+        for match in _RE_GPU_FORMAT.finditer(formats_stdout):
+            john_format = 'wpapsk-' + match.group(1)
+            if match.group(1) == 'opencl':
+                break
+        cls._format_cache = john_format
+        return cls._format_cache
 
     @staticmethod
     def crack_handshake(handshake, show_command=False, wordlist=None):
+        from .hashcat import HcxPcapTool  # Deferred: only needed once a capture is cracked
+
         john_file = HcxPcapTool.generate_john_file(handshake, show_command=show_command)
 
+        # Removed even if cracking is interrupted, so stale .john files do not pile up
+        try:
+            wordlist_path = wordlist or Configuration.wordlist
+            if not wordlist_path:
+                raise ValueError('No wordlist specified for john WPA attack')
+
+            keys = John._crack_john_file(john_file, [handshake.capfile], wordlist_path, show_command=show_command)
+            return keys[handshake.capfile]
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(john_file)
+
+    @staticmethod
+    def crack_handshakes(handshakes, show_command=False, wordlist=None):
+        '''
+        Cracks several handshakes with a single john run and a single `john --show`,
+        so john's startup (and OpenCL/CUDA initialisation) is paid once.
+        Returns:
+            Dict mapping each handshake's capfile to its key, or `None` if not found
+            (or if the capture could not be converted for john).
+        '''
         wordlist_path = wordlist or Configuration.wordlist
         if not wordlist_path:
             raise ValueError('No wordlist specified for john WPA attack')
 
-        # Use `john --list=formats` to find if OpenCL or CUDA is supported.
-        formats_raw = Process(['john', '--list=formats']).stdout()
-        if isinstance(formats_raw, bytes):
-            formats_stdout = formats_raw.decode('utf-8', errors='ignore')
-        else:
-            formats_stdout = formats_raw or ''
-        if 'wpapsk-opencl' in formats_stdout:
-            john_format = 'wpapsk-opencl'
-        elif 'wpapsk-cuda' in formats_stdout:
-            john_format = 'wpapsk-cuda'
-        else:
-            john_format = 'wpapsk'
+        keys = {handshake.capfile: None for handshake in handshakes}
+        if len(handshakes) == 1:
+            handshake = handshakes[0]
+            try:
+                keys[handshake.capfile] = John.crack_handshake(
+                    handshake, show_command=show_command, wordlist=wordlist_path)
+            except ValueError as e:
+                Color.pl('{!} {R}Error: {O}%s{W}' % e)
+            return keys
+
+        from .hashcat import HcxPcapTool  # Deferred: only needed once a capture is cracked
+
+        # hcxpcaptool always writes the same temp file, so each capture's hashes are
+        # appended to one merged file (every line keeps its capture's file name).
+        # A capture that cannot be converted is skipped rather than failing the batch.
+        john_file = Configuration.temp('batch.john')
+        try:
+            converted = []
+            with open(john_file, 'w') as merged:
+                for handshake in handshakes:
+                    try:
+                        generated = HcxPcapTool.generate_john_file(handshake, show_command=show_command)
+                    except ValueError as e:
+                        Color.pl('{!} {R}Error: {O}%s{W}' % e)
+                        continue
+                    try:
+                        with open(generated, 'r') as hash_handle:
+                            merged.write(hash_handle.read())
+                    finally:
+                        with contextlib.suppress(FileNotFoundError):
+                            os.unlink(generated)
+                    converted.append(handshake.capfile)
+
+            if converted:
+                keys.update(John._crack_john_file(john_file, converted, wordlist_path, show_command=show_command))
+            return keys
+        finally:
+            with contextlib.suppress(FileNotFoundError):
+                os.unlink(john_file)
+
+    @staticmethod
+    def _crack_john_file(john_file, capfiles, wordlist_path, show_command=False):
+        '''
+        Runs john against `john_file`, then `john --show` on it.
+        Returns a dict mapping each of `capfiles` to its key (or None).
+        '''
+        john_format = John._detect_format()
 
         # Crack john file
         command = [
@@ -56,18 +140,40 @@ class John(Dependency):
         if show_command:
             Color.pl('{+} {D}Running: {W}{P}%s{W}' % ' '.join(command))
         process = Process(command)
-        stdout, stderr = process.get_output()
-        stdout = stdout or ''
 
-        # Parse password (regex doesn't work for some reason)
-        key = None
-        if '0 password hashes cracked' not in stdout:
-            for line in stdout.split('\n'):
-                if handshake.capfile in line:
-                    key = line.split(':')[1]
-                    break
+        # Longer names are tried first so a capfile that ends another one's name
+        # is not mistaken for it.
+        names = '|'.join(re.escape(capfile) for capfile in sorted(set(capfiles), key=len, reverse=True))
+        names_re = re.compile(names)
+
+        # `--show` prints each input line with its hash field replaced by the
+        # password, so counting the fields after the hash in the input locates
+        # the password even when it contains ':'.
+        trailing_fields = {}
+        with open(john_file, 'r') as hash_handle:
+            for hash_line in hash_handle:
+                match = names_re.search(hash_line)
+                if match and '$WPAPSK$' in hash_line:
+                    trailing_fields.setdefault(
+                        match.group(0), hash_line.rstrip('\r\n').partition('$WPAPSK$')[2].count(':'))
 
-        if os.path.exists(john_file):
-            os.remove(john_file)
+        # Parse passwords line by line as john prints them, stopping once every capfile
+        # is found (the trailing "N password hashes cracked" summary never names one).
+        keys = dict.fromkeys(capfiles)
+        remaining = len(keys)
+        for line in iter(process.stdoutln, ''):
+            match = names_re.search(line)
+            if not match or keys[match.group(0)] is not None:
+                continue
+            _, separator, fields = line.rstrip('\r\n').partition(':')
+            if not separator:
+                continue
+            trailing = trailing_fields.get(match.group(0))
+            keys[match.group(0)] = fields.rsplit(':', trailing)[0] if trailing else fields.partition(':')[0]
+            remaining -= 1
+            if not remaining:
+                break
+        if process.poll() is None:
+            process.interrupt()
 
-        return key
+        return keys
@@ -2,10 +2,102 @@
 # -*- coding: utf-8 -*-
 
 from .dependency import Dependency
-from ..util.process import Process
 from ..util.color import Color
 from ..config import Configuration
 import re
+import subprocess
+
+# Patterns for parsing reaver/pixiewps output, compiled once at import. Labels and
+# flags are matched exactly as the tools print them; hex classes cover both cases.
+_RE_PIN = re.compile(r'WPS pin:\s*(\d+)')
+_RE_HEX = re.compile(r'\A[0-9a-fA-F]+\Z')
+_RE_PIXIEWPS_CMD = re.compile(r'pixiewps\s+-e\s+([a-fA-F0-9]+)\s+-s\s+([a-fA-F0-9]+)\s+-z\s+([a-fA-F0-9]+)')
+# Loose fallback: -e, -s and -z are looked up one after another within a bounded
+# window after "pixiewps" rather than with lazy `.*?` gaps that backtrack.
+_RE_CMD_PKE = re.compile(r'-e\s+([a-fA-F0-9]+)')
+_RE_CMD_EHASH1 = re.compile(r'-s\s+([a-fA-F0-9]+)')
+_RE_CMD_EHASH2 = re.compile(r'-z\s+([a-fA-F0-9]+)')
+_PIXIEWPS_CMD_WINDOW = 4096
+# The optional command-line flags are tokenized together (some versions use -m for the R-nonce).
+_RE_PIXIE_OPTS = re.compile(r'(?P<k>--authkey|--e-nonce|--r-nonce|-a|-n|-r|-m)\s+(?P<v>[a-fA-F0-9]+)')
+_PIXIE_OPT_KEYS = {
+    '-a': 'authkey', '--authkey': 'authkey',
+    '-n': 'e_nonce', '--e-nonce': 'e_nonce',
+    '-r': 'r_nonce', '--r-nonce': 'r_nonce', '-m': 'r_nonce',
+}
+# Reaver's labelled lines ("[P] PKE: ...") map to a parameter and a rank: where
+# several labels feed one parameter, the lower rank wins (PKE over ES1, ...).
+_LABEL_PARAMS = {
+    'PKE': ('pke', 0), 'ES1': ('pke', 1),
+    'E-HASH1': ('e_hash1', 0), 'EHASH1': ('e_hash1', 0), 'PSK1': ('e_hash1', 1),
+    'E-HASH2': ('e_hash2', 0), 'EHASH2': ('e_hash2', 0), 'PSK2': ('e_hash2', 1),
+    'AUTHKEY': ('authkey', 0),
+    'E-NONCE': ('e_nonce', 0), 'ENONCE': ('e_nonce', 0),
+    'R-NONCE': ('r_nonce', 0), 'RNONCE': ('r_nonce', 0),
+    'BSSID': ('e_bssid', 0),
+}
+_RE_MAC = re.compile(r'\A(?:[0-9a-fA-F]{2}:){5}[0-9a-fA-F]{2}\Z')
+_RE_BSSID_FLAG = re.compile(r'--bssid\s+((?:[0-9a-fA-F]{2}:){5}[0-9a-fA-F]{2})')
+
+# Parameters pixiewps cannot run without, in -e/-s/-z order.
+_CMD_PARAMS = ('pke', 'e_hash1', 'e_hash2')
+
+# PKE is required and only ever appears next to one of these (upper-cased) labels.
+_PKE_TAGS = ('PIXIEWPS', 'PKE', 'ES1')
+
+
+def _parse_labelled_lines(output):
+    '''
+    Returns {param: value} from reaver's labelled output in a single pass over
+    its lines: leading "[..]" tags are dropped and the label before ':' is
+    looked up in `_LABEL_PARAMS`.
+    '''
+    found = {}
+    for line in output.splitlines():
+        line = line.strip()
+        while line.startswith('['):
+            line = line.partition(']')[2].lstrip()
+        label, separator, value = line.partition(':')
+        if not separator:
+            continue
+        target = _LABEL_PARAMS.get(label.rstrip().upper())
+        if target is None:
+            continue
+        param, rank = target
+        value = value.strip().split(' ', 1)[0]
+        if not (_RE_MAC if param == 'e_bssid' else _RE_HEX).match(value):
+            continue
+        if param not in found or rank < found[param][0]:
+            found[param] = (rank, value)
+    return {param: value for param, (_, value) in found.items()}
+
+
+def _search_pixiewps_command(output, probe):
+    '''
+    Returns (pke, e_hash1, e_hash2) from a pixiewps command line in `output`,
+    or None. `probe` is `output` upper-cased, used to locate "pixiewps".
+    '''
+    match = _RE_PIXIEWPS_CMD.search(output)
+    if match:
+        return match.groups()
+
+    # Try alternative format with different spacing
+    start = probe.find('PIXIEWPS')
+    while start >= 0:
+        window = output[start:start + _PIXIEWPS_CMD_WINDOW]
+        values = []
+        position = 0
+        for pattern in (_RE_CMD_PKE, _RE_CMD_EHASH1, _RE_CMD_EHASH2):
+            match = pattern.search(window, position)
+            if not match:
+                break
+            values.append(match.group(1))
+            position = match.end()
+        else:
+            return tuple(values)
+        start = probe.find('PIXIEWPS', start + 1)
+    return None
+
 
 class Pixiewps(Dependency):
     ''' Wrapper for standalone Pixiewps tool '''
@@ -13,6 +105,8 @@ class Pixiewps(Dependency):
     dependency_name = 'pixiewps'
     dependency_url = 'https://github.com/wiire/pixiewps'
 
+    _CRACK_TIMEOUT = 30
+
     @staticmethod
     def crack_pin(pke, e_hash1, e_hash2, authkey=None, e_nonce=None, r_nonce=None, e_bssid=None):
         '''
@@ -28,6 +122,16 @@ class Pixiewps(Dependency):
         Returns:
             PIN if found, None otherwise
         '''
+        verbose = Configuration.verbose
+
+        # pixiewps rejects anything but hex straight away; skip spawning it for that.
+        required = (pke, e_hash1, e_hash2)
+        optional = tuple(value for value in (authkey, e_nonce, r_nonce) if value)
+        if not all(isinstance(value, str) and _RE_HEX.match(value) for value in required + optional):
+            if verbose > 0:
+                Color.pe('\n{P} [pixiewps] Skipping: parameters are missing or not hex{W}')
+            return None
+
         if not Pixiewps.exists():
             return None
 
@@ -44,20 +148,22 @@ class Pixiewps(Dependency):
             cmd.extend(['-b', e_bssid])
 
         try:
-            proc = Process(cmd)
-            raw_output = proc.stdout()
-            output = raw_output.decode('utf-8', errors='ignore') if isinstance(raw_output, bytes) else (raw_output or '')
+            # pixiewps finishes in milliseconds and prints a few lines; a plain
+            # subprocess.run avoids the tracked Process wrapper for it.
+            completed = subprocess.run(cmd, stdout=subprocess.PIPE, stderr=subprocess.PIPE,
+                                       timeout=Pixiewps._CRACK_TIMEOUT)
+            output = (completed.stdout or b'').decode('utf-8', errors='ignore')
             
-            if Configuration.verbose > 1:
+            if verbose > 1:
                 Color.pe('\n{P} [pixiewps] %s{W}' % output)
             
             # Parse output for PIN
-            pin_match = re.search(r'WPS pin:\s*(\d+)', output, re.IGNORECASE)
+            pin_match = _RE_PIN.search(output)
             if pin_match:
                 return pin_match.group(1)
                 
         except Exception as e:
-            if Configuration.verbose > 0:
+            if verbose > 0:
                 Color.pe('\n{P} [pixiewps] Error: %s{W}' % str(e))
         
         return None
@@ -69,113 +175,41 @@ class Pixiewps(Dependency):
         Supports multiple reaver output formats including pixiewps command lines
         Returns dict with extracted parameters or None
         '''
-        params = {}
+        if not output:
+            return None
+        if isinstance(output, bytes):
+            # Every field of interest is ASCII; latin-1 maps bytes 1:1 without the
+            # validation pass (and replacement handling) a UTF-8 decode would need.
+            output = output.decode('latin-1')
+        # Most reaver output carries no Pixie-Dust data at all; a few substring
+        # probes are far cheaper than running every pattern to find that out.
+        probe = output.upper()
+        if not any(tag in probe for tag in _PKE_TAGS):
+            return None
+
+        # Reaver's labelled lines (ES1/PSK1/PSK2 in some reaver versions) seed the
+        # result in one pass; a pixiewps command line, if echoed, takes precedence.
+        params = _parse_labelled_lines(output)
         
-        # Try to extract from pixiewps command line (most reliable)
         # Example: executing pixiewps -e <pke> -s <e_hash1> -z <e_hash2> -a <authkey> -n <e_nonce> -r <r_nonce>
-        # Improved pattern to handle various formats and whitespace
-        pixiewps_cmd_match = re.search(r'pixiewps\s+-e\s+([a-fA-F0-9]+)\s+-s\s+([a-fA-F0-9]+)\s+-z\s+([a-fA-F0-9]+)', output, re.IGNORECASE | re.MULTILINE)
-        if not pixiewps_cmd_match:
-            # Try alternative format with different spacing
-            pixiewps_cmd_match = re.search(r'pixiewps.*?-e\s+([a-fA-F0-9]+).*?-s\s+([a-fA-F0-9]+).*?-z\s+([a-fA-F0-9]+)', output, re.IGNORECASE | re.DOTALL)
-        
-        if pixiewps_cmd_match:
-            params['pke'] = pixiewps_cmd_match.group(1)
-            params['e_hash1'] = pixiewps_cmd_match.group(2)
-            params['e_hash2'] = pixiewps_cmd_match.group(3)
-            
-            # Extract optional parameters from command line (improved patterns)
-            authkey_match = re.search(r'-a\s+([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if not authkey_match:
-                authkey_match = re.search(r'--authkey\s+([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if authkey_match:
-                params['authkey'] = authkey_match.group(1)
-            
-            e_nonce_match = re.search(r'-n\s+([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if not e_nonce_match:
-                e_nonce_match = re.search(r'--e-nonce\s+([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if e_nonce_match:
-                params['e_nonce'] = e_nonce_match.group(1)
-            
-            r_nonce_match = re.search(r'-r\s+([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if not r_nonce_match:
-                r_nonce_match = re.search(r'--r-nonce\s+([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if not r_nonce_match:
-                r_nonce_match = re.search(r'-m\s+([a-fA-F0-9]+)', output, re.IGNORECASE)  # Some versions use -m
-            if r_nonce_match:
-                params['r_nonce'] = r_nonce_match.group(1)
-        
-        # If command line extraction failed, try direct pattern matching
-        if 'pke' not in params:
-            # Extract PKE (Enrollee's DH public key) - try multiple formats
-            pke_match = re.search(r'PKE:\s*([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if not pke_match:
-                # Try without colon (some formats)
-                pke_match = re.search(r'\[.*?\]\s*PKE\s*:\s*([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if not pke_match:
-                # Try ES1/ES2 format (some reaver versions)
-                pke_match = re.search(r'ES1:\s*([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if not pke_match:
-                # Try [*] ES1 format
-                pke_match = re.search(r'\[\*\]\s*ES1:\s*([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if pke_match:
-                params['pke'] = pke_match.group(1)
-        
-        if 'e_hash1' not in params:
-            # Extract E-Hash1 - try multiple formats
-            e_hash1_match = re.search(r'E-?Hash1:\s*([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if not e_hash1_match:
-                e_hash1_match = re.search(r'\[.*?\]\s*E-?Hash1\s*:\s*([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if not e_hash1_match:
-                # Try PSK1 format (some reaver versions)
-                e_hash1_match = re.search(r'PSK1:\s*([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if not e_hash1_match:
-                # Try [*] PSK1 format
-                e_hash1_match = re.search(r'\[\*\]\s*PSK1:\s*([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if e_hash1_match:
-                params['e_hash1'] = e_hash1_match.group(1)
-        
-        if 'e_hash2' not in params:
-            # Extract E-Hash2 - try multiple formats
-            e_hash2_match = re.search(r'E-?Hash2:\s*([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if not e_hash2_match:
-                e_hash2_match = re.search(r'\[.*?\]\s*E-?Hash2\s*:\s*([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if not e_hash2_match:
-                # Try PSK2 format (some reaver versions)
-                e_hash2_match = re.search(r'PSK2:\s*([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if not e_hash2_match:
-                # Try [*] PSK2 format
-                e_hash2_match = re.search(r'\[\*\]\s*PSK2:\s*([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if e_hash2_match:
-                params['e_hash2'] = e_hash2_match.group(1)
-        
-        # Extract optional parameters if not already found
-        if 'authkey' not in params:
-            authkey_match = re.search(r'AuthKey:\s*([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if authkey_match:
-                params['authkey'] = authkey_match.group(1)
-        
-        if 'e_nonce' not in params:
-            e_nonce_match = re.search(r'E-?Nonce:\s*([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if e_nonce_match:
-                params['e_nonce'] = e_nonce_match.group(1)
+        pixiewps_cmd = _search_pixiewps_command(output, probe)
         
-        if 'r_nonce' not in params:
-            r_nonce_match = re.search(r'R-?Nonce:\s*([a-fA-F0-9]+)', output, re.IGNORECASE)
-            if r_nonce_match:
-                params['r_nonce'] = r_nonce_match.group(1)
+        if pixiewps_cmd:
+            # Optional parameters from the command line in one pass (first value wins)
+            options = {}
+            for opt_match in _RE_PIXIE_OPTS.finditer(output):
+                options.setdefault(_PIXIE_OPT_KEYS[opt_match.group('k')], opt_match.group('v'))
+            options.update(zip(_CMD_PARAMS, pixiewps_cmd))
+            params.update(options)
         
-        # Extract BSSID (useful for pixiewps)
+        # Extract BSSID from the --bssid flag if it was not labelled
         if 'e_bssid' not in params:
-            bssid_match = re.search(r'BSSID:\s*([a-fA-F0-9:]{17})', output, re.IGNORECASE)
-            if not bssid_match:
-                # Try extracting from --bssid flag
-                bssid_match = re.search(r'--bssid\s+([a-fA-F0-9:]{17})', output, re.IGNORECASE)
+            bssid_match = _RE_BSSID_FLAG.search(output)
             if bssid_match:
                 params['e_bssid'] = bssid_match.group(1)
         
         # Return params if we have the minimum required parameters
-        if 'pke' in params and 'e_hash1' in params and 'e_hash2' in params:
+        if all(param in params for param in _CMD_PARAMS):
             return params
         
         return None
@@ -196,7 +230,6 @@ class Pixiewps(Dependency):
 
 if __name__ == '__main__':
     # Test the Pixiewps integration
-    from ..config import Configuration
     Configuration.initialize(False)
     
     # Test with sample parameters
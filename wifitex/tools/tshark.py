@@ -138,7 +138,7 @@ class Tshark(Dependency):
         if not raw_output:
             return list(ssid_pairs)
 
-        output = raw_output.decode('utf-8', errors='ignore') if isinstance(raw_output, bytes) else str(raw_output)
+        output = raw_output if isinstance(raw_output, str) else raw_output.decode('utf-8', errors='ignore')
 
         for line in output.splitlines():
             # Extract src, dst, and essid
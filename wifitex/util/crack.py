@@ -2,21 +2,24 @@
 # -*- coding: utf-8 -*-
 
 from ..config import Configuration
-from ..model.handshake import Handshake
-from ..model.wpa_result import CrackResultWPA
-from ..model.pmkid_result import CrackResultPMKID
 from ..util.process import Process
 from ..util.color import Color
 from ..util.input import raw_input
-from ..tools.aircrack import Aircrack
-from ..tools.cowpatty import Cowpatty
-from ..tools.hashcat import Hashcat, HcxPcapTool
-from ..tools.john import John
 
-from json import loads
+# The cracking tools, result models, json and concurrent.futures are imported
+# where they are used: listing handshakes and checking is_cracked() need none of them.
 
 import os
+import re
+import stat
+from operator import itemgetter
 
+# Capture files are saved as <prefix>_<essid>_<bssid>_<YYYY-mm-ddTHH-MM-SS>.<ext>
+_RE_HANDSHAKE_FILE = re.compile(
+    r'^([^_]+)_([^_]+)_([^_]+)_(\d{4}-\d{2}-\d{2})T(\d{2}-\d{2}-\d{2})\.(cap|22000|16800)$')
+_HANDSHAKE_TYPES = {'cap': '4-WAY', '22000': 'PMKID', '16800': 'PMKID'}
+# One token of the handshake selection prompt: "all", "N" or "N-M"
+_RE_SELECTION = re.compile(r'(all)|(\d+)(?:\s*-\s*(\d+))?')
 
 # TODO: Bring back the 'print' option, for easy copy/pasting. Just one-liners people can paste into terminal.
 
@@ -32,10 +35,38 @@ class CrackHelper:
     DEFAULT_WORDLIST_FILENAMES = (
         'wordlist-top4800-probable.txt',
     )
+    WORDLIST_EXTENSIONS = ('.txt', '.lst', '.gz')
+    _cracked_cache = None  # (cracked_file, mtime, basenames)
+    _default_wordlist_dir = None
+    _default_wordlists_cache = None  # (directory mtime, sorted wordlist paths)
 
-    @staticmethod
-    def _resolve_default_wordlist_dir():
-        return os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'wordlists'))
+    @classmethod
+    def _resolve_default_wordlist_dir(cls):
+        if cls._default_wordlist_dir is None:
+            cls._default_wordlist_dir = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', 'wordlists'))
+        return cls._default_wordlist_dir
+
+    @classmethod
+    def _default_wordlists(cls):
+        '''
+        Returns the wordlist files in the bundled wordlist directory, sorted by name.
+        The directory is only re-scanned when its mtime changes.
+        '''
+        default_dir = cls._resolve_default_wordlist_dir()
+        try:
+            mtime = os.stat(default_dir).st_mtime
+        except OSError:
+            return []
+        if cls._default_wordlists_cache is None or cls._default_wordlists_cache[0] != mtime:
+            try:
+                with os.scandir(default_dir) as it:
+                    matching = [entry for entry in it
+                                if entry.name.lower().endswith(cls.WORDLIST_EXTENSIONS) and entry.is_file()]
+            except OSError:
+                return []
+            matching.sort(key=lambda entry: entry.name)
+            cls._default_wordlists_cache = (mtime, [entry.path for entry in matching])
+        return cls._default_wordlists_cache[1]
 
     @classmethod
     def _ensure_default_wordlist(cls):
@@ -55,42 +86,38 @@ class CrackHelper:
                 return
 
         # Fallback to the first textual wordlist available
-        for entry in sorted(os.listdir(default_dir)):
-            candidate = os.path.join(default_dir, entry)
-            if os.path.isfile(candidate) and entry.lower().endswith(('.txt', '.lst', '.gz')):
-                Configuration.wordlist = os.path.abspath(candidate)
-                Color.pl('{+} Using default wordlist from {C}%s{W}' % Configuration.wordlist)
-                return
+        default_wordlists = cls._default_wordlists()
+        if default_wordlists:
+            Configuration.wordlist = default_wordlists[0]
+            Color.pl('{+} Using default wordlist from {C}%s{W}' % Configuration.wordlist)
 
     @classmethod
     def _collect_wordlists(cls):
         """Gather all available wordlists, prioritizing configured and project defaults."""
-        seen = set()
-        wordlists = []
+        # (st_dev, st_ino) -> path, in insertion order; links to one file count once
+        wordlists = {}
 
         def add(path):
             if not path:
                 return
-            abs_path = os.path.abspath(path)
-            if abs_path in seen:
+            try:
+                st = os.stat(path)
+            except OSError:
                 return
-            if os.path.isfile(abs_path):
-                seen.add(abs_path)
-                wordlists.append(abs_path)
+            key = (st.st_dev, st.st_ino)
+            if key not in wordlists and stat.S_ISREG(st.st_mode):
+                wordlists[key] = os.path.abspath(path)
 
         add(getattr(Configuration, 'wordlist', None))
 
-        default_dir = cls._resolve_default_wordlist_dir()
-        if os.path.isdir(default_dir):
-            for entry in sorted(os.listdir(default_dir)):
-                if entry.lower().endswith(('.txt', '.lst', '.gz')):
-                    add(os.path.join(default_dir, entry))
+        for path in cls._default_wordlists():
+            add(path)
 
         custom_paths = getattr(Configuration, 'custom_wordlist_paths', []) or []
         for path in custom_paths:
             add(path)
 
-        return wordlists
+        return list(wordlists.values())
 
     @classmethod
     def _wordlists_for_attack(cls):
@@ -106,6 +133,12 @@ class CrackHelper:
 
     @classmethod
     def run(cls):
+        from concurrent.futures import ThreadPoolExecutor
+        from ..tools.aircrack import Aircrack
+        from ..tools.cowpatty import Cowpatty
+        from ..tools.hashcat import Hashcat, HcxPcapTool
+        from ..tools.john import John
+
         Configuration.initialize(False)
         cls._ensure_default_wordlist()
 
@@ -135,7 +168,7 @@ class CrackHelper:
             return
 
         hs_to_crack = cls.get_user_selection(handshakes)
-        all_pmkid = all([hs['type'] == 'PMKID' for hs in hs_to_crack])
+        all_pmkid = all(hs['type'] == 'PMKID' for hs in hs_to_crack)
 
         # Tools for cracking & their dependencies.
         tool_dependencies = {
@@ -144,13 +177,21 @@ class CrackHelper:
             'john':     [John, HcxPcapTool],
             'cowpatty': [Cowpatty]
         }
+        # Look up each distinct dependency once, with the PATH walks overlapping.
+        dependency_names = sorted({dep.dependency_name for deps in tool_dependencies.values() for dep in deps})
+        with ThreadPoolExecutor(max_workers=len(dependency_names)) as executor:
+            present = {
+                name: path is not None
+                for name, path in zip(dependency_names, executor.map(Process.which, dependency_names))
+            }
+
         # Identify missing tools
         available_tools = {}
         missing_tools = []
         for tool, dependencies in tool_dependencies.items():
             missing = [
                 dep for dep in dependencies
-                if not Process.exists(dep.dependency_name)
+                if not present[dep.dependency_name]
             ]
             if len(missing) > 0:
                 missing_tools.append((tool, missing))
@@ -259,6 +300,18 @@ class CrackHelper:
                     return
 
         try:
+            pmkid_batch = [hs for hs in hs_to_crack if hs['type'] == 'PMKID'] if hashcat_available else []
+            if len(pmkid_batch) > 1:
+                # Crack all selected PMKID hashes in shared hashcat runs.
+                cls.crack_pmkid_batch(pmkid_batch)
+                hs_to_crack = [hs for hs in hs_to_crack if hs['type'] != 'PMKID']
+
+            john_batch = [hs for hs in hs_to_crack if hs['type'] == '4-WAY'] if tool_name == 'john' else []
+            if len(john_batch) > 1:
+                # Crack all selected handshakes in shared john runs.
+                cls.crack_4way_batch(john_batch)
+                hs_to_crack = [hs for hs in hs_to_crack if hs['type'] != '4-WAY']
+
             for hs in hs_to_crack:
                 if hs['type'] == 'PMKID':
                     if not hashcat_available:
@@ -270,20 +323,38 @@ class CrackHelper:
         except KeyboardInterrupt:
             Color.pl('\n{!} {O}Interrupted{W}')
 
+    @classmethod
+    def _load_cracked_basenames(cls):
+        '''
+        Returns the set of capture basenames recorded in the cracked file.
+        The file is parsed once and re-read only when its mtime changes.
+        '''
+        from json import loads
+
+        cracked_file = Configuration.cracked_file
+        try:
+            mtime = os.stat(cracked_file).st_mtime
+        except OSError:
+            return set()
+        if cls._cracked_cache is not None and cls._cracked_cache[:2] == (cracked_file, mtime):
+            return cls._cracked_cache[2]
+
+        cracked = set()
+        try:
+            with open(cracked_file, 'rb') as f:
+                results = loads(f.read())
+        except (OSError, ValueError):
+            results = None
+        for result in results or []:
+            for k, v in result.items():
+                if 'file' in k and isinstance(v, str):
+                    cracked.add(os.path.basename(v))
+        cls._cracked_cache = (cracked_file, mtime, cracked)
+        return cracked
+
     @classmethod
     def is_cracked(cls, file):
-        if not os.path.exists(Configuration.cracked_file):
-            return False
-        with open(Configuration.cracked_file) as f:
-            json = loads(f.read())
-        if json is None:
-            return False
-        for result in json:
-            for k in result.keys():
-                v = result[k]
-                if 'file' in k and os.path.basename(v) == file:
-                    return True
-        return False
+        return file in cls._load_cracked_basenames()
 
     @classmethod
     def get_handshakes(cls):
@@ -297,49 +368,34 @@ class CrackHelper:
             return []
 
         Color.pl('\n{+} Listing captured handshakes from {C}%s{W}:\n' % os.path.abspath(hs_dir))
-        for hs_file in os.listdir(hs_dir):
-            if hs_file.count('_') != 3:
+        cracked = cls._load_cracked_basenames()
+        hashcat_present = Process.exists('hashcat')
+        with os.scandir(hs_dir) as it:
+            entries = list(it)
+        for entry in entries:
+            hs_file = entry.name
+            match = _RE_HANDSHAKE_FILE.match(hs_file)
+            if match is None:
                 continue
 
-            if cls.is_cracked(hs_file):
+            if hs_file in cracked:
                 skipped_cracked_files += 1
                 continue
 
-            if hs_file.endswith('.cap'):
-                # WPA Handshake
-                hs_type = '4-WAY'
-            elif hs_file.endswith(('.22000', '.16800')):
-                # PMKID hash
-                if not Process.exists('hashcat'):
-                    skipped_pmkid_files += 1
-                    continue
-                hs_type = 'PMKID'
-            else:
+            name, essid, bssid, days, hours, ext = match.groups()
+            hs_type = _HANDSHAKE_TYPES[ext]
+            if hs_type == 'PMKID' and not hashcat_present:
+                skipped_pmkid_files += 1
                 continue
-
-            name, essid, bssid, date = hs_file.split('_')
-            date = date.rsplit('.', 1)[0]
-            days,hours = date.split('T')
-            hours = hours.replace('-', ':')
-            date = '%s %s' % (days, hours)
+            date = '%s %s' % (days, hours.replace('-', ':'))
 
             handshake = {
-                'filename': os.path.join(hs_dir, hs_file),
+                'filename': entry.path,
                 'bssid': bssid.replace('-', ':'),
                 'essid': essid,
                 'date': date,
                 'type': hs_type
             }
-
-            if hs_file.endswith('.cap'):
-                # WPA Handshake
-                handshake['type'] = '4-WAY'
-            elif hs_file.endswith(('.22000', '.16800')):
-                # PMKID hash
-                handshake['type'] = 'PMKID'
-            else:
-                continue
-
             handshakes.append(handshake)
 
         if skipped_pmkid_files > 0:
@@ -347,31 +403,23 @@ class CrackHelper:
         if skipped_cracked_files > 0:
             Color.pl('{!} {O}Skipping %d already cracked files.{W}\n' % skipped_cracked_files)
 
-        # Sort by Date (Descending)
-        return sorted(handshakes, key=lambda x: x.get('date'), reverse=True)
+        # Sort by Date (Descending); the fixed-width date strings sort chronologically
+        return sorted(handshakes, key=itemgetter('date'), reverse=True)
 
 
     @classmethod
     def print_handshakes(cls, handshakes):
-        # Header
-        max_essid_len = max([len(hs['essid']) for hs in handshakes] + [len('ESSID (truncated)')])
-        Color.p('{W}{D}  NUM')
-        Color.p('  ' + 'ESSID (truncated)'.ljust(max_essid_len))
-        Color.p('  ' + 'BSSID'.ljust(17))
-        Color.p('  ' + 'TYPE'.ljust(5))
-        Color.p('  ' + 'DATE CAPTURED\n')
-        Color.p('  ---')
-        Color.p('  ' + ('-' * max_essid_len))
-        Color.p('  ' + ('-' * 17))
-        Color.p('  ' + ('-' * 5))
-        Color.p('  ' + ('-' * 19) + '{W}\n')
-        # Handshakes
+        max_essid_len = max(len('ESSID (truncated)'), max(len(hs['essid']) for hs in handshakes))
+        # Header and rows are assembled first and written in a single call
+        lines = [
+            '{W}{D}  NUM  %s  %s  %s  DATE CAPTURED\n' % (
+                'ESSID (truncated)'.ljust(max_essid_len), 'BSSID'.ljust(17), 'TYPE'.ljust(5)),
+            '  ---  %s  %s  %s  %s{W}\n' % ('-' * max_essid_len, '-' * 17, '-' * 5, '-' * 19),
+        ]
+        row = '  {G}%3d{W}  {C}%-' + str(max_essid_len) + 's{W}  {O}%-17s{W}  {C}%-5s{W}  {W}%s{W}\n'
         for index, handshake in enumerate(handshakes, start=1):
-            Color.p('  {G}%s{W}' % str(index).rjust(3))
-            Color.p('  {C}%s{W}' % handshake['essid'].ljust(max_essid_len))
-            Color.p('  {O}%s{W}' % handshake['bssid'].ljust(17))
-            Color.p('  {C}%s{W}' % handshake['type'].ljust(5))
-            Color.p('  {W}%s{W}\n' % handshake['date'])
+            lines.append(row % (index, handshake['essid'], handshake['bssid'], handshake['type'], handshake['date']))
+        Color.p(''.join(lines))
 
 
     @classmethod
@@ -382,17 +430,12 @@ class CrackHelper:
         choices = raw_input()
 
         selection = []
-        for choice in choices.split(','):
-            if '-' in choice:
-                first, last = [int(x) for x in choice.split('-')]
-                for index in range(first, last + 1):
-                    selection.append(handshakes[index-1])
-            elif choice.strip().lower() == 'all':
-                selection = handshakes[:]
-                break
-            elif [c.isdigit() for c in choice]:
-                index = int(choice)
-                selection.append(handshakes[index-1])
+        for match in _RE_SELECTION.finditer(choices.lower()):
+            select_all, first, last = match.groups()
+            if select_all:
+                return handshakes[:]
+            first = max(int(first), 1)
+            selection.extend(handshakes[first - 1:int(last or first)])
 
         return selection
 
@@ -409,6 +452,11 @@ class CrackHelper:
         else:
             raise ValueError('Cannot crack handshake: Type is not PMKID or 4-WAY. Handshake=%s' % hs)
 
+        cls.report_result(hs, crack_result)
+
+
+    @classmethod
+    def report_result(cls, hs, crack_result):
         if crack_result is None:
             # Failed to crack
             Color.pl('{!} {R}Failed to crack {O}%s{R} ({O}%s{R}): Passphrase not in dictionary' % (
@@ -422,6 +470,12 @@ class CrackHelper:
 
     @classmethod
     def crack_4way(cls, hs, tool):
+        from ..model.handshake import Handshake
+        from ..model.wpa_result import CrackResultWPA
+        from ..tools.aircrack import Aircrack
+        from ..tools.cowpatty import Cowpatty
+        from ..tools.hashcat import Hashcat
+        from ..tools.john import John
 
         handshake = Handshake(hs['filename'],
                 bssid=hs['bssid'],
@@ -437,48 +491,43 @@ class CrackHelper:
             Color.pl('{!} {R}No wordlists found. Unable to crack handshake.{W}')
             return None
 
-        original_wordlist = getattr(Configuration, 'wordlist', None)
-        try:
-            if tool == 'hashcat':
-                if wordlists:
-                    Configuration.wordlist = wordlists[0]
-                else:
-                    Configuration.wordlist = None
+        # Wordlists are passed to the tools explicitly; Configuration.wordlist is left alone.
+        if tool == 'hashcat':
+            if len(wordlists) > 1:
+                Color.pl('{+} Processing {C}%d{W} wordlists with {C}hashcat{W} (includes brute-force plan).' % len(wordlists))
+            key = Hashcat.crack_handshake(
+                handshake,
+                show_command=True,
+                wordlists=wordlists
+            )
+            if key is not None:
+                return CrackResultWPA(hs['bssid'], hs['essid'], hs['filename'], key)
+        else:
+            for index, wordlist in enumerate(wordlists, start=1):
                 if len(wordlists) > 1:
-                    Color.pl('{+} Processing {C}%d{W} wordlists with {C}hashcat{W} (includes brute-force plan).' % len(wordlists))
-                key = Hashcat.crack_handshake(
-                    handshake,
-                    show_command=True,
-                    wordlists=wordlists
-                )
+                    Color.pl('{+} Trying wordlist {C}%d{W}/{C}%d{W}: {G}%s{W}' % (
+                        index, len(wordlists), os.path.basename(wordlist)))
+
+                if tool == 'aircrack':
+                    key = Aircrack.crack_handshake(handshake, show_command=True, wordlist=wordlist)
+                elif tool == 'john':
+                    key = John.crack_handshake(handshake, show_command=True, wordlist=wordlist)
+                elif tool == 'cowpatty':
+                    key = Cowpatty.crack_handshake(handshake, show_command=True, wordlist=wordlist)
+                else:
+                    key = None
+
                 if key is not None:
                     return CrackResultWPA(hs['bssid'], hs['essid'], hs['filename'], key)
-            else:
-                for index, wordlist in enumerate(wordlists, start=1):
-                    if len(wordlists) > 1:
-                        Color.pl('{+} Trying wordlist {C}%d{W}/{C}%d{W}: {G}%s{W}' % (
-                            index, len(wordlists), os.path.basename(wordlist)))
-                    Configuration.wordlist = wordlist
-
-                    if tool == 'aircrack':
-                        key = Aircrack.crack_handshake(handshake, show_command=True, wordlist=wordlist)
-                    elif tool == 'john':
-                        key = John.crack_handshake(handshake, show_command=True, wordlist=wordlist)
-                    elif tool == 'cowpatty':
-                        key = Cowpatty.crack_handshake(handshake, show_command=True, wordlist=wordlist)
-                    else:
-                        key = None
-
-                    if key is not None:
-                        return CrackResultWPA(hs['bssid'], hs['essid'], hs['filename'], key)
-        finally:
-            Configuration.wordlist = original_wordlist
 
         return None
 
 
     @classmethod
     def crack_pmkid(cls, hs, tool):
+        from ..model.pmkid_result import CrackResultPMKID
+        from ..tools.hashcat import Hashcat
+
         if tool != 'hashcat':
             Color.pl('{!} {O}Note: PMKID hashes can only be cracked using {C}hashcat{W}')
 
@@ -487,27 +536,89 @@ class CrackHelper:
             Color.pl('{!} {R}No wordlists found. Unable to crack PMKID hash.{W}')
             return None
 
-        original_wordlist = getattr(Configuration, 'wordlist', None)
-        try:
-            if wordlists:
-                Configuration.wordlist = wordlists[0]
-            else:
-                Configuration.wordlist = None
+        if len(wordlists) > 1:
+            Color.pl('{+} Processing {C}%d{W} wordlists with {C}hashcat{W} (includes brute-force plan).' % len(wordlists))
 
-            if len(wordlists) > 1:
-                Color.pl('{+} Processing {C}%d{W} wordlists with {C}hashcat{W} (includes brute-force plan).' % len(wordlists))
+        key = Hashcat.crack_pmkid(
+            hs['filename'],
+            verbose=True,
+            wordlists=wordlists
+        )
+        if key is not None:
+            return CrackResultPMKID(hs['bssid'], hs['essid'], hs['filename'], key)
 
-            key = Hashcat.crack_pmkid(
-                hs['filename'],
-                verbose=True,
-                wordlists=wordlists
-            )
+        return None
+
+
+    @classmethod
+    def crack_pmkid_batch(cls, hs_list):
+        from ..model.pmkid_result import CrackResultPMKID
+        from ..tools.hashcat import Hashcat
+
+        Color.pl('\n{+} Cracking {G}%d{W} PMKID hashes together with {C}hashcat{W}' % len(hs_list))
+
+        wordlists = cls._wordlists_for_attack()
+        if not wordlists:
+            Color.pl('{!} {R}No wordlists found. Unable to crack PMKID hashes.{W}')
+            return
+
+        keys = Hashcat.crack_pmkid_files(
+            [hs['filename'] for hs in hs_list],
+            verbose=True,
+            wordlists=wordlists
+        )
+        for hs in hs_list:
+            key = keys.get(hs['filename'])
+            crack_result = None
             if key is not None:
-                return CrackResultPMKID(hs['bssid'], hs['essid'], hs['filename'], key)
-        finally:
-            Configuration.wordlist = original_wordlist
+                crack_result = CrackResultPMKID(hs['bssid'], hs['essid'], hs['filename'], key)
+            cls.report_result(hs, crack_result)
 
-        return None
+
+    @classmethod
+    def crack_4way_batch(cls, hs_list):
+        from ..model.handshake import Handshake
+        from ..model.wpa_result import CrackResultWPA
+        from ..tools.john import John
+
+        Color.pl('\n{+} Cracking {G}%d{W} handshakes together with {C}john{W}' % len(hs_list))
+
+        wordlists = cls._wordlists_for_attack()
+        if not wordlists:
+            Color.pl('{!} {R}No wordlists found. Unable to crack handshakes.{W}')
+            return
+
+        handshakes = {}
+        for hs in hs_list:
+            handshake = Handshake(hs['filename'],
+                    bssid=hs['bssid'],
+                    essid=hs['essid'])
+            try:
+                handshake.divine_bssid_and_essid()
+            except ValueError as e:
+                Color.pl('{!} {R}Error: {O}%s{W}' % e)
+                continue
+            handshakes[hs['filename']] = handshake
+
+        keys = {}
+        for index, wordlist in enumerate(wordlists, start=1):
+            pending = [handshake for filename, handshake in handshakes.items() if filename not in keys]
+            if not pending:
+                break
+            if len(wordlists) > 1:
+                Color.pl('{+} Trying wordlist {C}%d{W}/{C}%d{W}: {G}%s{W}' % (
+                    index, len(wordlists), os.path.basename(wordlist)))
+            results = John.crack_handshakes(pending, show_command=True, wordlist=wordlist)
+            keys.update((filename, key) for filename, key in results.items() if key is not None)
+
+        for hs in hs_list:
+            if hs['filename'] not in handshakes:
+                continue
+            key = keys.get(hs['filename'])
+            crack_result = None
+            if key is not None:
+                crack_result = CrackResultWPA(hs['bssid'], hs['essid'], hs['filename'], key)
+            cls.report_result(hs, crack_result)
 
 
 if __name__ == '__main__':
@@ -7,8 +7,10 @@ import os
 import shlex
 import atexit
 import shutil
-from typing import Any, IO, Optional, Sequence, Union, List
+import weakref
+from typing import Any, Dict, IO, Optional, Sequence, Union, List
 
+import subprocess
 from subprocess import Popen, PIPE
 
 from ..util.color import Color
@@ -18,8 +20,16 @@ from ..config import Configuration
 class Process(object):
     ''' Represents a running/ran process '''
 
+    _VERSION_TIMEOUT = 10  # seconds to wait for `<program> --version`
     _tracking_enabled = False
-    _tracked_processes: List["Process"] = []
+    # Weak references: a Process that is garbage-collected interrupts itself (__del__)
+    # and drops out of the set on its own.
+    _tracked_processes: "weakref.WeakSet[Process]" = weakref.WeakSet()
+    _tracked_since_sweep = 0
+    _TRACK_SWEEP_INTERVAL = 32
+    # Paths of programs already found on PATH. Misses are not cached, so a
+    # tool installed while wifitex runs (e.g. from the GUI) is picked up.
+    _which_cache: Dict[str, str] = {}
 
     @staticmethod
     def devnull():
@@ -27,9 +37,11 @@ class Process(object):
         return open('/dev/null', 'w')
 
     @staticmethod
-    def call(command: Union[str, Sequence[Union[str, os.PathLike]]], cwd: Optional[str] = None, shell: bool = False):
+    def call(command: Union[str, Sequence[Union[str, os.PathLike]]], cwd: Optional[str] = None, shell: bool = False,
+             timeout: Optional[float] = None):
         '''
             Calls a command (either string or list of args).
+            Raises subprocess.TimeoutExpired if it runs longer than `timeout` seconds.
             Returns tuple:
                 (stdout, stderr)
         '''
@@ -58,16 +70,9 @@ class Process(object):
             else:
                 Color.pe('\n {C}[?]{W} Executing: {B}%s{W}' % log_command)
 
-        pid = Popen(popen_command, cwd=cwd, stdout=PIPE, stderr=PIPE, shell=run_shell)
-        pid.wait()
-        (stdout, stderr) = pid.communicate()
-
-        # Python 3 compatibility
-        if isinstance(stdout, bytes):
-            stdout = stdout.decode('utf-8', errors='ignore')
-        if isinstance(stderr, bytes):
-            stderr = stderr.decode('utf-8', errors='ignore')
-
+        completed = subprocess.run(popen_command, cwd=cwd, stdout=PIPE, stderr=PIPE, shell=run_shell,
+                                   encoding='utf-8', errors='ignore', timeout=timeout)
+        stdout, stderr = completed.stdout, completed.stderr
 
         if Configuration.verbose > 1 and isinstance(stdout, str):
             stdout_text = stdout.strip()
@@ -87,13 +92,21 @@ class Process(object):
 
     @staticmethod
     def which(program: Optional[Union[str, os.PathLike]]):
-        ''' Returns absolute path to program, or None if not found '''
+        ''' Returns absolute path to program, or None if not found (found paths are cached) '''
         if not program:
             return None
+        program = str(program)
         try:
-            return shutil.which(str(program))
+            return Process._which_cache[program]
+        except KeyError:
+            pass
+        try:
+            path = shutil.which(program)
         except Exception:
             return None
+        if path is not None:
+            Process._which_cache[program] = path
+        return path
 
     @staticmethod
     def get_version(program: Union[str, os.PathLike],
@@ -119,13 +132,11 @@ class Process(object):
         cmd.extend(args)
 
         try:
-            stdout, stderr = Process.call(cmd)
+            stdout, stderr = Process.call(cmd, timeout=Process._VERSION_TIMEOUT)
         except Exception:
             return None
 
         for stream in (stdout, stderr):
-            if isinstance(stream, bytes):
-                stream = stream.decode('utf-8', errors='ignore')
             if isinstance(stream, str):
                 text = stream.strip()
                 if text != '':
@@ -165,7 +176,9 @@ class Process(object):
 
         self.start_time = time.time()
 
-        self.pid = Popen(command_args, stdout=sout, stderr=serr, stdin=stdin, cwd=cwd, bufsize=bufsize)
+        # Pipes are opened in text mode so output is decoded as it is read
+        self.pid = Popen(command_args, stdout=sout, stderr=serr, stdin=stdin, cwd=cwd, bufsize=bufsize,
+                         encoding='utf-8', errors='ignore')
         self._track_process()
 
     def __del__(self):
@@ -199,23 +212,17 @@ class Process(object):
 
     def stdoutln(self):
         if self.pid.stdout:
-            line = self.pid.stdout.readline()
-            if isinstance(line, bytes):
-                return line.decode('utf-8', errors='ignore')
-            return line
+            return self.pid.stdout.readline()
         return ''
 
     def stderrln(self):
         if self.pid.stderr:
-            line = self.pid.stderr.readline()
-            if isinstance(line, bytes):
-                return line.decode('utf-8', errors='ignore')
-            return line
+            return self.pid.stderr.readline()
         return ''
 
     def stdin(self, text):
         if self.pid.stdin:
-            self.pid.stdin.write(text.encode('utf-8'))
+            self.pid.stdin.write(text)
             self.pid.stdin.flush()
 
     def get_output(self):
@@ -225,12 +232,6 @@ class Process(object):
         if self.out is None:
             (self.out, self.err) = self.pid.communicate()
 
-        if isinstance(self.out, bytes):
-            self.out = self.out.decode('utf-8', errors='ignore')
-
-        if isinstance(self.err, bytes):
-            self.err = self.err.decode('utf-8', errors='ignore')
-
         return (self.out, self.err)
 
     def poll(self):
@@ -247,7 +248,7 @@ class Process(object):
     def interrupt(self, wait_time=2.0):
         '''
             Send interrupt to current process.
-            If process fails to exit within `wait_time` seconds, terminates it.
+            If process fails to exit within `wait_time` seconds, terminates it (then kills it).
         '''
         try:
             pid = self.pid.pid
@@ -260,17 +261,18 @@ class Process(object):
 
             os.kill(pid, signal.SIGINT)
 
-            start_time = time.time()  # Time since Interrupt was sent
-            while self.pid.poll() is None:
-                # Process is still running
-                time.sleep(0.1)
-                if time.time() - start_time > wait_time:
-                    # We waited too long for process to die, terminate it.
-                    if Configuration.verbose > 1:
-                        Color.pe('\n {C}[?] {W} Waited > %0.2f seconds for process to die, killing it' % wait_time)
-                    os.kill(pid, signal.SIGTERM)
-                    self.pid.terminate()
-                    break
+            try:
+                # Returns as soon as the process exits
+                self.pid.wait(timeout=wait_time)
+            except subprocess.TimeoutExpired:
+                # We waited too long for process to die, terminate it (and kill it if that fails too).
+                if Configuration.verbose > 1:
+                    Color.pe('\n {C}[?] {W} Waited > %0.2f seconds for process to die, killing it' % wait_time)
+                self.pid.terminate()
+                try:
+                    self.pid.wait(timeout=1.0)
+                except subprocess.TimeoutExpired:
+                    self.pid.kill()
 
         except OSError as e:
             if 'No such process' in e.__str__():
@@ -291,12 +293,20 @@ class Process(object):
 
     @classmethod
     def _track(cls, proc: "Process"):
-        if cls._tracking_enabled:
-            cls._tracked_processes.append(proc)
+        if not cls._tracking_enabled:
+            return
+        cls._tracked_processes.add(proc)
+        cls._tracked_since_sweep += 1
+        if cls._tracked_since_sweep >= cls._TRACK_SWEEP_INTERVAL:
+            # Forget processes that have already exited but are still referenced elsewhere
+            cls._tracked_since_sweep = 0
+            for tracked in list(cls._tracked_processes):
+                if tracked.pid.poll() is not None:
+                    cls._tracked_processes.discard(tracked)
 
     @classmethod
     def _cleanup_tracked_processes(cls):
-        for proc in cls._tracked_processes:
+        for proc in list(cls._tracked_processes):
             try:
                 if proc.pid and proc.pid.poll() is None:
                     proc.interrupt()
@@ -3,7 +3,7 @@
 
 from ..util.color import Color
 from ..tools.airodump import Airodump
-from ..util.input import raw_input, xrange
+from ..util.input import raw_input
 from ..model.target import Target, WPSState
 from ..config import Configuration
 
@@ -214,7 +214,7 @@ class Scanner(object):
             if '-' in choice:
                 # User selected a range
                 (lower,upper) = [int(x) - 1 for x in choice.split('-')]
-                for i in xrange(lower, min(len(self.targets), upper + 1)):
+                for i in range(lower, min(len(self.targets), upper + 1)):
                     chosen_targets.append(self.targets[i])
             elif choice.isdigit():
                 choice = int(choice) - 1